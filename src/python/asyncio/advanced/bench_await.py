@@ -0,0 +1,49 @@
+"""
+Benchmark a deep await chain of native coroutines
+
+Runs the main -> add -> some_result chain of the async/await example many
+times. some_result gets its result in the next step/tick, so every Task
+suspends once.
+
+Usage: python bench_await.py [COUNT]
+"""
+
+import sys
+import time
+
+from future import Future
+from loop import Loop
+from task import Task
+
+
+async def some_result(result):
+    future = Future("Some Result")
+    loop.schedule("Some Result", future.set_result, result)
+    return await future
+
+
+async def add(coroutine1, coroutine2):
+    task1 = Task(coroutine1, "Add X")
+    task2 = Task(coroutine2, "Add Y")
+    x = await task1
+    y = await task2
+    return x + y
+
+
+async def main():
+    return await add(some_result(1), some_result(2))
+
+
+async def run(count: int):
+    for _ in range(count):
+        await main()
+
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+loop = Loop.get_current_loop()
+start = time.perf_counter()
+loop.run(run(count))
+duration = time.perf_counter() - start
+print(f"{count} await chains in {duration:.2f}s")
+print(f"{duration / count * 1e6:.2f} µs per await chain")
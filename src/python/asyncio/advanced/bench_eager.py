@@ -0,0 +1,50 @@
+"""
+Benchmark eager starting Tasks
+
+Most tasks find their result in a cache and complete synchronously while only
+some have to wait for it.
+
+Usage: python bench_eager.py [TASKS] [HIT_RATIO]
+"""
+
+import sys
+import time
+
+from loop import Loop
+from tracing import TickCounter
+from wait import ensure_future, gather, sleep
+
+cache = {}
+
+
+def lookup(key: int):
+    if key in cache:
+        return cache[key]
+
+    yield from sleep(0)  # pretend to fetch the result
+    cache[key] = key
+    return key
+
+
+def main(count: int, eager_start: bool):
+    tasks = [ensure_future(lookup(i), eager_start) for i in range(count)]
+    pending = [task for task in tasks if not task.done()]
+    if pending:
+        yield from gather(pending)
+    return sum(task.result() for task in tasks)
+
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+hit_ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.9
+
+loop = Loop.get_current_loop()
+for eager_start in (False, True):
+    cache = {i: i for i in range(int(count * hit_ratio))}
+    counter = TickCounter()
+    loop.set_trace_hook(counter)
+    start = time.perf_counter()
+    loop.run(main(count, eager_start))
+    duration = time.perf_counter() - start
+    print(
+        f"eager_start={eager_start}: {duration:.3f}s " f"{counter.ticks} ticks"
+    )
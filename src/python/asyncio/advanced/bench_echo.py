@@ -0,0 +1,84 @@
+"""
+Echo server benchmark for the selector based Loop
+
+Starts a local echo server and connects many concurrent clients to it. Each
+client sends a number of messages and waits for the echo of every message.
+
+Usage: python bench_echo.py [CLIENTS] [MESSAGES]
+"""
+
+import resource
+import socket
+import sys
+import time
+
+from loop import Loop
+from wait import ensure_future, gather
+
+MESSAGE = b"x" * 64
+
+
+def raise_fd_limit(needed: int) -> int:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        soft = min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+    return soft
+
+
+def echo(conn: socket.socket):
+    while True:
+        data = yield from loop.sock_recv(conn, 4096)
+        if not data:
+            break
+        yield from loop.sock_sendall(conn, data)
+    conn.close()
+
+
+def serve(server: socket.socket, clients: int):
+    for _ in range(clients):
+        conn, _address = yield from loop.sock_accept(server)
+        ensure_future(echo(conn))
+
+
+def client(port: int, messages: int):
+    conn = yield from loop.create_connection("127.0.0.1", port)
+    for _ in range(messages):
+        yield from loop.sock_sendall(conn, MESSAGE)
+        received = 0
+        while received < len(MESSAGE):
+            data = yield from loop.sock_recv(conn, 4096)
+            received += len(data)
+    conn.close()
+    return messages
+
+
+def main(clients: int, messages: int):
+    server = socket.create_server(("127.0.0.1", 0), backlog=clients)
+    server.setblocking(False)
+    port = server.getsockname()[1]
+    ensure_future(serve(server, clients))
+
+    results = yield from gather(
+        [client(port, messages) for _ in range(clients)]
+    )
+    server.close()
+    return sum(results)
+
+
+clients = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+messages = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+# every client needs two file descriptors. one for each side of the connection
+limit = raise_fd_limit(2 * clients + 64)
+if 2 * clients + 64 > limit:
+    clients = (limit - 64) // 2
+    print(f"Limited to {clients} clients by the open file limit of {limit}")
+
+loop = Loop.get_current_loop()
+start = time.perf_counter()
+total = loop.run(main(clients, messages))
+duration = time.perf_counter() - start
+
+print(f"{clients} clients sent {total} messages in {duration:.2f}s")
+print(f"{total / duration:.0f} messages/s")
@@ -0,0 +1,71 @@
+"""
+Benchmark offloading blocking work with run_in_executor
+
+Some tasks hash large blobs while a ticker task stands in for I/O and should
+wake up every few milliseconds. Hashing inside the coroutine blocks the loop
+and delays the ticker. In the executor the loop keeps running because hashlib
+releases the GIL for large data.
+
+Usage: python bench_executor.py [BLOBS] [SIZE_MB]
+"""
+
+import hashlib
+import sys
+import time
+
+from loop import Loop
+from wait import gather, sleep
+
+INTERVAL = 0.005
+
+
+def digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_inline(data: bytes):
+    yield from sleep(0)
+    return digest(data)
+
+
+def hash_in_executor(data: bytes):
+    return (yield from loop.run_in_executor(None, digest, data))
+
+
+def ticker(done: list):
+    # stands in for I/O tasks. measure how late it is woken up
+    max_delay = 0.0
+    while not done:
+        start = loop.time()
+        yield from sleep(INTERVAL)
+        max_delay = max(max_delay, loop.time() - start - INTERVAL)
+    return max_delay
+
+
+def hash_all(hasher, blobs: list, done: list):
+    digests = yield from gather([hasher(data) for data in blobs])
+    done.append(True)
+    return digests
+
+
+def main(hasher, blobs: list):
+    done = []
+    _digests, max_delay = yield from gather(
+        [hash_all(hasher, blobs, done), ticker(done)]
+    )
+    return max_delay
+
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+size = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+blobs = [bytes([i]) * size * 2**20 for i in range(count)]
+
+loop = Loop.get_current_loop()
+for hasher in (hash_inline, hash_in_executor):
+    start = time.perf_counter()
+    max_delay = loop.run(main(hasher, blobs))
+    duration = time.perf_counter() - start
+    print(
+        f"{hasher.__name__}: hashed {count * size} MB in {duration:.2f}s, "
+        f"ticker delayed by up to {max_delay * 1000:.1f}ms"
+    )
@@ -0,0 +1,61 @@
+"""
+Micro benchmarks for Futures
+
+Usage: python bench_future.py [COUNT]
+"""
+
+import sys
+import timeit
+
+from future import Future
+from loop import Loop
+
+
+def noop(_future: Future) -> None:
+    pass
+
+
+def create() -> None:
+    Future()
+
+
+def create_resolve() -> None:
+    future = Future()
+    future.set_result(1)
+    future.result()
+
+
+def create_callback_resolve() -> None:
+    future = Future()
+    future.add_done_callback(noop)
+    future.set_result(1)
+    loop.run_step()
+
+
+def await_futures(count: int):
+    for _ in range(count):
+        future = Future()
+        loop.schedule(None, future.set_result, 1)
+        yield from future
+
+
+def await_done_futures(count: int):
+    for _ in range(count):
+        future = Future()
+        future.set_result(1)
+        yield from future
+
+
+def report(name: str, duration: float, count: int) -> None:
+    print(f"{name:>24}: {duration / count * 1e9:>7.0f} ns")
+
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+loop = Loop.get_current_loop()
+
+for function in (create, create_resolve, create_callback_resolve):
+    report(function.__name__, timeit.timeit(function, number=count), count)
+
+for function in (await_futures, await_done_futures):
+    duration = timeit.timeit(lambda: loop.run(function(count)), number=1)
+    report(function.__name__, duration, count)
@@ -0,0 +1,52 @@
+"""
+Benchmark the wasted CPU time of gather if a task fails early
+
+Many tasks do some CPU work in small steps. One of them fails right at the
+start. Without cancel_on_error gather waits for all other tasks to finish their
+work although the result is an exception anyway.
+
+Usage: python bench_gather.py [TASKS] [STEPS]
+"""
+
+import sys
+import time
+
+from loop import Loop
+from wait import gather
+
+
+def work(steps: int):
+    total = 0
+    for _ in range(steps):
+        total += sum(range(500))
+        yield  # let others run
+    return total
+
+
+def fail():
+    yield
+    raise ValueError("Failed early")
+
+
+def main(tasks: int, steps: int, **kwargs):
+    coroutines = [work(steps) for _ in range(tasks - 1)]
+    coroutines.insert(tasks // 2, fail())
+    try:
+        yield from gather(coroutines, **kwargs)
+    except (ValueError, ExceptionGroup) as exc:
+        return exc
+
+
+tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+steps = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+loop = Loop.get_current_loop()
+for kwargs in (
+    {},
+    {"cancel_on_error": True},
+    {"cancel_on_error": True, "group_exceptions": True},
+):
+    start = time.process_time()
+    exc = loop.run(main(tasks, steps, **kwargs))
+    cpu = time.process_time() - start
+    print(f"gather({kwargs}): {cpu:.2f}s CPU time, raised {exc!r}")
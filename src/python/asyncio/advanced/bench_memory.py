@@ -0,0 +1,52 @@
+"""
+Memory benchmark for pending tasks
+
+Measures the bytes per pending Task including its scheduled Handle and the
+coroutine via tracemalloc. The implementation of the step 16 directory is
+compared with the one of this directory. Each implementation is measured in its
+own process because both use the same module names.
+
+Usage: python bench_memory.py [TASKS]
+"""
+
+import os
+import subprocess
+import sys
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+IMPLEMENTATIONS = {
+    "step 16": os.path.join(HERE, "..", "step16"),
+    "advanced": HERE,
+}
+
+
+def work():
+    yield
+
+
+def measure(count: int) -> float:
+    from wait import ensure_future
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = [ensure_future(work()) for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # don't count the list holding the tasks
+    return (after - before - sys.getsizeof(tasks)) / count
+
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+if len(sys.argv) > 2:
+    # measure in a child process
+    sys.path.insert(0, sys.argv[2])
+    print(measure(count))
+else:
+    for name, path in IMPLEMENTATIONS.items():
+        output = subprocess.check_output(
+            [sys.executable, __file__, str(count), path], text=True
+        )
+        print(f"{name}: {float(output):.0f} bytes per pending task")
@@ -0,0 +1,155 @@
+"""
+Benchmark the overhead of the LoopMetrics
+
+Runs two workloads without a hook and with LoopMetrics enabled. Many tasks run
+many handles per step/tick. A single task runs a single handle per step/tick,
+which is the worst case for a per tick overhead.
+
+Disabled metrics are compared with an UntracedLoop whose run_step has no
+branch for a hook at all. The runs of both loops are interleaved and the
+median of the ratios of neighboring runs is used to reduce the noise.
+Disabled metrics must not cost more than 2%.
+
+Usage: python bench_metrics.py [TASKS] [STEPS] [REPEATS]
+"""
+
+import gc
+import heapq
+import selectors
+import statistics
+import sys
+import time
+from collections import deque
+from typing import List
+
+from loop import Loop
+from metrics import LoopMetrics
+from wait import gather, sleep
+
+MAX_OVERHEAD = 0.02
+
+
+def work(steps: int):
+    for _ in range(steps):
+        yield  # let others run
+
+
+async def many_tasks(tasks: int, steps: int):
+    await gather([work(steps) for _ in range(tasks)])
+
+
+def single_task(tasks: int, steps: int):
+    yield from work(tasks * steps)
+
+
+class UntracedLoop(Loop):
+    """The Loop without any support for tracing"""
+
+    def run_step(self) -> None:
+        self._remove_cancelled_timers()
+
+        self._selecting = True
+        if self._scheduled:
+            timeout = 0
+        elif self._timers:
+            timeout = max(0, self._timers[0]._when - self.time())
+        else:
+            timeout = None
+
+        events = self._selector.select(timeout)
+        self._selecting = False
+        for key, mask in events:
+            reader, writer = key.data
+            if mask & selectors.EVENT_READ and reader is not None:
+                self._scheduled.append(reader)
+            if mask & selectors.EVENT_WRITE and writer is not None:
+                self._scheduled.append(writer)
+
+        timers = self._timers
+        end_time = self.time() + self._clock_resolution
+        while timers and timers[0]._when <= end_time:
+            handle = heapq.heappop(timers)
+            handle._scheduled = False
+            if handle._cancelled:
+                self._cancelled_timers -= 1
+            else:
+                self._scheduled.append(handle)
+
+        scheduled, self._scheduled = self._scheduled, deque()
+        while scheduled:
+            handle = scheduled.popleft()
+            if not handle._cancelled:
+                handle.run()
+
+
+def measure(loop: Loop, hook, workload, tasks: int, steps: int) -> float:
+    # futures and tasks use the current loop of the thread
+    Loop._local.loop = loop
+    loop.set_trace_hook(hook)
+    # don't let a garbage collection of a previous run hit this one
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    loop.run(workload(tasks, steps))
+    duration = time.perf_counter() - start
+    gc.enable()
+    loop.set_trace_hook(None)
+    return duration
+
+
+def overhead(durations: List[float], baselines: List[float]) -> float:
+    # the runs of a repeat are neighbors and suffer from the same load
+    return statistics.median(d / b for d, b in zip(durations, baselines)) - 1
+
+
+async def block(duration: float):
+    # a callback that blocks the loop for too long
+    await sleep(0)
+    time.sleep(duration)
+
+
+tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+steps = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+loop = Loop.get_current_loop()
+untraced = UntracedLoop()
+
+for workload in (many_tasks, single_task):
+    durations = {"untraced": [], "disabled": [], "enabled": []}
+    for repeat in range(repeats):
+        runs = [
+            ("untraced", untraced, None),
+            ("disabled", loop, None),
+            ("enabled", loop, LoopMetrics()),
+        ]
+        if repeat % 2:
+            # don't let the order of the runs favor one of them
+            runs.reverse()
+        for variant, run_loop, hook in runs:
+            durations[variant].append(
+                measure(run_loop, hook, workload, tasks, steps)
+            )
+
+    baseline = statistics.median(durations["untraced"])
+    disabled = overhead(durations["disabled"], durations["untraced"])
+    enabled = overhead(durations["enabled"], durations["untraced"])
+    print(
+        f"{workload.__name__}: untraced {baseline:.3f}s, "
+        f"metrics disabled {disabled * 100:+.1f}%, "
+        f"enabled {enabled * 100:+.1f}%"
+    )
+    assert disabled < MAX_OVERHEAD, f"disabled metrics cost {disabled:.1%}"
+
+Loop._local.loop = loop
+metrics = LoopMetrics(slow_callback_duration=0.05)
+loop.set_trace_hook(metrics)
+loop.run(block(0.1))
+loop.set_trace_hook(None)
+
+snapshot = metrics.as_dict()
+print(
+    f"{snapshot['ticks']} ticks, {snapshot['handles']} handles, "
+    f"{snapshot['slow_callbacks']} slow callbacks"
+)
+print(metrics.to_prometheus())
@@ -0,0 +1,78 @@
+"""
+Ping-pong benchmark for the await latency
+
+Two tasks pass a value back and forth via Futures. The latency of a round trip
+is measured in steps/ticks and in wall time. The SchedulingTask wakes up like
+our previous Tasks by scheduling another step instead of continuing directly.
+
+Usage: python bench_pingpong.py [ROUNDS]
+"""
+
+import sys
+import time
+
+from future import Future
+from loop import Loop
+from task import Task
+from tracing import TickCounter
+
+
+class SchedulingTask(Task):
+    __slots__ = ()
+
+    def _wakeup(self, future: Future) -> None:
+        try:
+            future.result()
+        except Exception as exc:
+            self.schedule(exc)
+        else:
+            self.schedule()
+
+
+class Channel:
+    def __init__(self):
+        self._waiter = None
+
+    def send(self, value) -> None:
+        waiter, self._waiter = self._waiter, None
+        waiter.set_result(value)
+
+    def receive(self) -> Future:
+        self._waiter = Future("receive")
+        return self._waiter
+
+
+def ping(rounds: int, inbox: Channel, outbox: Channel):
+    for i in range(rounds):
+        outbox.send(i)
+        yield from inbox.receive()
+
+
+def pong(rounds: int, inbox: Channel, outbox: Channel):
+    for _ in range(rounds):
+        value = yield from inbox.receive()
+        outbox.send(value)
+
+
+def main(rounds: int, task_class: type):
+    a, b = Channel(), Channel()
+    # pong must wait for the first value before ping sends it
+    pong_task = task_class(pong(rounds, a, b))
+    ping_task = task_class(ping(rounds, b, a))
+    yield from ping_task
+    yield from pong_task
+
+
+rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+loop = Loop.get_current_loop()
+for task_class in (SchedulingTask, Task):
+    counter = TickCounter()
+    loop.set_trace_hook(counter)
+    start = time.perf_counter()
+    loop.run(main(rounds, task_class))
+    duration = time.perf_counter() - start
+    print(
+        f"{task_class.__name__}: {counter.ticks / rounds:.1f} ticks "
+        f"{duration / rounds * 1e6:.1f} µs per round trip"
+    )
@@ -0,0 +1,109 @@
+"""
+Benchmark request latencies with and without a ConnectionPool
+
+Starts five local stand-in HTTP servers like the five Mastodon servers of the
+example. Every new connection waits a few milliseconds before it is served to
+simulate the round-trips of a TCP and TLS handshake to a remote server. Many
+workers send requests to random servers and the latency of every request is
+recorded.
+
+Usage: python bench_pool.py [WORKERS] [REQUESTS] [HANDSHAKE_MS]
+"""
+
+import random
+import statistics
+import sys
+import time
+
+from loop import Loop
+from pool import ConnectionPool
+from streams import open_connection, start_server
+from wait import gather, sleep
+
+SERVERS = 5
+REQUEST = b"GET /api/v1/timelines/public HTTP/1.1\r\nHost: localhost\r\n\r\n"
+RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n[]"
+
+
+async def handle_client(reader, writer):
+    await sleep(handshake)
+    while True:
+        # read the request head until the empty line
+        line = await reader.readline()
+        if not line:
+            break
+        while line != b"\r\n":
+            line = await reader.readline()
+        writer.write(RESPONSE)
+        await writer.drain()
+    writer.close()
+
+
+async def read_response(reader) -> bytes:
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    return await reader.readexactly(length)
+
+
+async def request_without_pool(pool, port: int) -> bytes:
+    reader, writer = await open_connection("127.0.0.1", port)
+    writer.write(REQUEST)
+    body = await read_response(reader)
+    writer.close()
+    return body
+
+
+async def request_with_pool(pool, port: int) -> bytes:
+    connection = await pool.acquire("127.0.0.1", port)
+    try:
+        connection.writer.write(REQUEST)
+        body = await read_response(connection.reader)
+    except BaseException:
+        pool.release(connection, reuse=False)
+        raise
+    pool.release(connection)
+    return body
+
+
+async def worker(request, pool, ports: list, count: int) -> list:
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        body = await request(pool, random.choice(ports))
+        latencies.append(time.perf_counter() - start)
+        assert body == b"[]"
+    return latencies
+
+
+async def main(request, workers: int, count: int):
+    servers = [
+        start_server(handle_client, "127.0.0.1", 0) for _ in range(SERVERS)
+    ]
+    ports = [server.port for server in servers]
+    pool = ConnectionPool(limit_per_host=workers // SERVERS)
+    results = await gather(
+        [worker(request, pool, ports, count) for _ in range(workers)]
+    )
+    pool.close()
+    for server in servers:
+        server.close()
+    return [latency for latencies in results for latency in latencies]
+
+
+workers = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+handshake = (float(sys.argv[3]) if len(sys.argv) > 3 else 5) / 1000
+
+loop = Loop.get_current_loop()
+for request in (request_without_pool, request_with_pool):
+    latencies = loop.run(main(request, workers, count))
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{request.__name__}: p50 {percentiles[49] * 1000:.2f}ms "
+        f"p99 {percentiles[98] * 1000:.2f}ms"
+    )
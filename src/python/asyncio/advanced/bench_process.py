@@ -0,0 +1,96 @@
+"""
+Benchmark running many child processes concurrently
+
+Half of the children cat a file and the other half run yes | head. Their
+output is read from the pipes and counted. Running them one after another with
+subprocess.run blocks the loop for every child. A ticker task measures how
+long the loop is blocked.
+
+Usage: python bench_process.py [CHILDREN] [SIZE_KB]
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+
+from loop import Loop
+from process import PIPE, create_subprocess_exec
+from wait import gather, sleep
+
+INTERVAL = 0.005
+
+
+def commands(children: int, size: int, path: str) -> list:
+    cat = ["cat", path]
+    yes = ["sh", "-c", f"yes | head -c {size}"]
+    return [cat if i % 2 else yes for i in range(children)]
+
+
+async def run_child(command: list) -> int:
+    process = await create_subprocess_exec(*command, stdout=PIPE)
+    received = 0
+    while True:
+        data = await process.stdout.read(65536)
+        if not data:
+            break
+        received += len(data)
+    assert await process.wait() == 0
+    return received
+
+
+async def concurrent(children: int, size: int, path: str) -> int:
+    results = await gather(
+        [run_child(command) for command in commands(children, size, path)]
+    )
+    return sum(results)
+
+
+async def sequential(children: int, size: int, path: str) -> int:
+    received = 0
+    for command in commands(children, size, path):
+        # blocks the loop until the child has exited
+        result = subprocess.run(command, stdout=PIPE, check=True)
+        received += len(result.stdout)
+    return received
+
+
+async def ticker(done: list) -> float:
+    max_delay = 0.0
+    while not done:
+        start = loop.time()
+        await sleep(INTERVAL)
+        max_delay = max(max_delay, loop.time() - start - INTERVAL)
+    return max_delay
+
+
+async def main(run, children: int, size: int, path: str):
+    done = []
+
+    async def run_all():
+        await sleep(INTERVAL / 2)  # let the ticker start first
+        received = await run(children, size, path)
+        done.append(True)
+        return received
+
+    return await gather([run_all(), ticker(done)])
+
+
+children = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+size = (int(sys.argv[2]) if len(sys.argv) > 2 else 1024) * 1024
+
+loop = Loop.get_current_loop()
+with tempfile.NamedTemporaryFile() as file:
+    file.write(b"x" * size)
+    file.flush()
+
+    for run in (sequential, concurrent):
+        start = time.perf_counter()
+        received, max_delay = loop.run(main(run, children, size, file.name))
+        duration = time.perf_counter() - start
+        assert received == children * size
+        print(
+            f"{run.__name__}: {children} children in {duration:.2f}s "
+            f"{received / 2**20 / duration:.0f} MB/s, "
+            f"ticker delayed by up to {max_delay * 1000:.0f}ms"
+        )
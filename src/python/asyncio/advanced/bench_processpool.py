@@ -0,0 +1,84 @@
+"""
+Benchmark offloading pure Python CPU work to worker processes
+
+Transforms many small posts like the ones of the public feeds in the Mastodon
+example with 1, 2, 4 and 8 worker processes. Additionally compares sending the
+posts one by one against sending them in chunks and returning a large result
+pickled against returning it via shared memory.
+
+Usage: python bench_processpool.py [ITEMS] [RESULT_MB]
+"""
+
+import os
+import sys
+import time
+
+from loop import Loop
+from processpool import ProcessPool
+
+WORDS = "the quick brown fox jumps over the lazy dog".split()
+
+
+def transform(post: int) -> int:
+    # some pure Python work. count the letters of the words of a post
+    text = " ".join(WORDS[(post + i) % len(WORDS)] for i in range(20))
+    counts = {}
+    for char in text:
+        counts[char] = counts.get(char, 0) + 1
+    return max(counts.values())
+
+
+def render(size: int) -> bytes:
+    return b"x" * size
+
+
+def bench_workers(items: int):
+    for workers in (1, 2, 4, 8):
+        with ProcessPool(workers) as pool:
+            start = time.perf_counter()
+            results = yield from pool.map(transform, range(items))
+            duration = time.perf_counter() - start
+        assert len(results) == items
+        print(f"{workers} workers: {items / duration:.0f} items/s")
+
+
+def bench_chunks(items: int):
+    with ProcessPool(2) as pool:
+        for chunksize in (1, 1000):
+            start = time.perf_counter()
+            yield from pool.map(transform, range(items), chunksize)
+            duration = time.perf_counter() - start
+            print(f"chunksize={chunksize}: {items / duration:.0f} items/s")
+
+
+def bench_shared(size: int):
+    with ProcessPool(1) as pool:
+        yield from pool.submit(render, 1)  # start the worker
+
+        start = time.perf_counter()
+        result = yield from pool.submit(render, size)
+        print(
+            f"pickled result: {len(result) / 2**20:.0f} MB in "
+            f"{time.perf_counter() - start:.3f}s"
+        )
+
+        start = time.perf_counter()
+        with (yield from pool.submit_shared(render, size)) as result:
+            print(
+                f"shared memory result: {result.buf.nbytes / 2**20:.0f} MB in "
+                f"{time.perf_counter() - start:.3f}s"
+            )
+
+
+def main(items: int, size: int):
+    print(f"{os.cpu_count()} CPUs")
+    yield from bench_workers(items)
+    yield from bench_chunks(items // 100)
+    yield from bench_shared(size)
+
+
+items = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+size = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+
+loop = Loop.get_current_loop()
+loop.run(main(items, size * 2**20))
@@ -0,0 +1,86 @@
+"""
+Benchmark producer/consumer throughput of a Queue against busy-wait polling
+
+One producer passes items to many consumers. The polling variant uses a plain
+deque and consumers and producer just yield until they can continue. Every
+idle consumer is therefore rescheduled in every step/tick.
+
+Usage: python bench_queue.py [ITEMS] [CONSUMERS] [MAXSIZE]
+"""
+
+import sys
+import time
+from collections import deque
+
+from loop import Loop
+from queues import Queue
+from tracing import TickCounter
+from wait import gather
+
+STOP = object()
+
+
+def polling_producer(items: deque, count: int, consumers: int, maxsize: int):
+    for item in list(range(count)) + [STOP] * consumers:
+        while len(items) >= maxsize:
+            yield  # busy-wait until there is space again
+        items.append(item)
+
+
+def polling_consumer(items: deque):
+    total = 0
+    while True:
+        while not items:
+            yield  # busy-wait for the next item
+        item = items.popleft()
+        if item is STOP:
+            return total
+        total += item
+
+
+def polling_main(count: int, consumers: int, maxsize: int):
+    items = deque()
+    coroutines = [polling_consumer(items) for _ in range(consumers)]
+    coroutines.append(polling_producer(items, count, consumers, maxsize))
+    results = yield from gather(coroutines)
+    return sum(results[:-1])
+
+
+def queue_producer(queue: Queue, count: int, consumers: int):
+    for item in list(range(count)) + [STOP] * consumers:
+        yield from queue.put(item)
+
+
+def queue_consumer(queue: Queue):
+    total = 0
+    while True:
+        item = yield from queue.get()
+        if item is STOP:
+            return total
+        total += item
+
+
+def queue_main(count: int, consumers: int, maxsize: int):
+    queue = Queue(maxsize)
+    coroutines = [queue_consumer(queue) for _ in range(consumers)]
+    coroutines.append(queue_producer(queue, count, consumers))
+    results = yield from gather(coroutines)
+    return sum(results[:-1])
+
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+consumers = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+maxsize = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+loop = Loop.get_current_loop()
+for main in (polling_main, queue_main):
+    counter = TickCounter()
+    loop.set_trace_hook(counter)
+    start = time.perf_counter()
+    total = loop.run(main(count, consumers, maxsize))
+    duration = time.perf_counter() - start
+    assert total == sum(range(count))
+    print(
+        f"{main.__name__}: {count / duration:.0f} items/s "
+        f"{counter.ticks} ticks"
+    )
@@ -0,0 +1,47 @@
+"""
+Benchmark task throughput with a different number of loop threads
+
+Batches of small tasks are spread round-robin across the loops of a
+ShardedRunner. The results are passed back to the loop of the main thread.
+
+Usage: python bench_sharding.py [BATCHES] [TASKS]
+"""
+
+import sys
+import time
+
+from loop import Loop
+from sharding import ShardedRunner
+from wait import gather, sleep
+
+
+def work(number: int):
+    yield from sleep(0)
+    return number
+
+
+def batch(tasks: int):
+    results = yield from gather([work(i) for i in range(tasks)])
+    return len(results)
+
+
+def main(runner: ShardedRunner, batches: int, tasks: int):
+    results = yield from gather(
+        [runner.submit(batch(tasks)) for _ in range(batches)]
+    )
+    return sum(results)
+
+
+batches = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+tasks = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+print(f"GIL {'enabled' if gil else 'disabled'}")
+
+loop = Loop.get_current_loop()
+for shards in (1, 2, 4, 8):
+    with ShardedRunner(shards) as runner:
+        start = time.perf_counter()
+        total = loop.run(main(runner, batches, tasks))
+        duration = time.perf_counter() - start
+    print(f"{shards} loop threads: {total / duration:.0f} tasks/s")
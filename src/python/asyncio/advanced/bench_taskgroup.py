@@ -0,0 +1,48 @@
+"""
+Benchmark the memory peak of a crawl like fan-out with a TaskGroup
+
+Every fetch allocates a response buffer and waits a bit as if it would receive
+data from the network. Without max_concurrency all fetches are running at the
+same time and all buffers are alive at once.
+
+Usage: python bench_taskgroup.py [URLS] [CONCURRENCY]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from loop import Loop
+from taskgroups import TaskGroup
+from wait import sleep
+
+BUFFER_SIZE = 16 * 1024
+
+
+async def fetch(url: int) -> int:
+    buffer = bytearray(BUFFER_SIZE)
+    await sleep(0.001)
+    return len(buffer)
+
+
+async def crawl(urls: int, max_concurrency: int) -> int:
+    async with TaskGroup(max_concurrency=max_concurrency) as group:
+        futures = [group.create_task(fetch(url)) for url in range(urls)]
+    return sum(future.result() for future in futures)
+
+
+urls = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+loop = Loop.get_current_loop()
+for max_concurrency in (None, concurrency):
+    tracemalloc.start()
+    start = time.perf_counter()
+    total = loop.run(crawl(urls, max_concurrency))
+    duration = time.perf_counter() - start
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"max_concurrency={max_concurrency}: fetched {total} bytes in "
+        f"{duration:.2f}s, memory peak {peak / 2**20:.1f} MiB"
+    )
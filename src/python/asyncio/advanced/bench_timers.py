@@ -0,0 +1,61 @@
+"""
+Timer benchmark for the Loop
+
+Schedules a lot of timers and cancels most of them before they are due.
+Cancelled timers must not stay in the timer heap and the Loop must not burn CPU
+while it waits for the remaining timers.
+
+Usage: python bench_timers.py [TIMERS] [CANCEL_RATIO]
+"""
+
+import random
+import sys
+import time
+
+from loop import Loop
+from wait import sleep
+
+fired = 0
+
+
+def on_timer() -> None:
+    global fired
+    fired += 1
+
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+cancel_ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.9
+max_delay = 2.0
+
+loop = Loop.get_current_loop()
+
+start = time.perf_counter()
+handles = [
+    loop.call_later(random.uniform(0.5, max_delay), "timer", on_timer)
+    for _ in range(count)
+]
+print(f"call_later for {count} timers: {time.perf_counter() - start:.2f}s")
+
+start = time.perf_counter()
+cancelled = handles[: int(count * cancel_ratio)]
+for handle in cancelled:
+    handle.cancel()
+print(f"cancel of {len(cancelled)} timers: {time.perf_counter() - start:.2f}s")
+del handles, cancelled
+
+print(f"timer heap before cleanup: {len(loop._timers)} entries")
+start = time.perf_counter()
+# runs at the beginning of every step/tick
+loop._remove_cancelled_timers()
+print(
+    f"timer heap after cleanup: {len(loop._timers)} entries "
+    f"({time.perf_counter() - start:.2f}s)"
+)
+
+start = time.perf_counter()
+cpu_start = time.process_time()
+loop.run(sleep(max_delay))
+wall = time.perf_counter() - start
+cpu = time.process_time() - cpu_start
+
+print(f"{fired} timers fired in {wall:.2f}s using {cpu:.2f}s CPU time")
@@ -0,0 +1,52 @@
+"""
+Benchmark the overhead of tracing the Loop
+
+Runs many tasks that give control back to the loop a couple of times with
+tracing disabled, with a TickRecorder and with printing every step/tick like
+our previous Loops did.
+
+Usage: python bench_tracing.py [TASKS] [STEPS]
+"""
+
+import contextlib
+import os
+import sys
+import time
+
+from loop import Loop
+from tracing import PrintHook, TickRecorder
+from wait import gather
+
+
+def work(steps: int):
+    for _ in range(steps):
+        yield  # let others run
+
+
+def main(tasks: int, steps: int):
+    yield from gather([work(steps) for _ in range(tasks)])
+
+
+def measure(hook, tasks: int, steps: int) -> float:
+    loop.set_trace_hook(hook)
+    start = time.perf_counter()
+    loop.run(main(tasks, steps))
+    return time.perf_counter() - start
+
+
+tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+steps = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+loop = Loop.get_current_loop()
+
+print(f"no tracing: {measure(None, tasks, steps):.3f}s")
+
+recorder = TickRecorder()
+print(f"tick recorder: {measure(recorder, tasks, steps):.3f}s")
+print("last ticks:")
+for tick in list(recorder.ticks)[-3:]:
+    print(f"  {tick.handles} handles in {tick.duration * 1000:.3f}ms")
+
+with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+    duration = measure(PrintHook(), tasks, steps)
+print(f"printing every step: {duration:.3f}s")
@@ -0,0 +1,106 @@
+"""
+Benchmark the throughput of a local echo connection
+
+Compares the sock_recv and sock_sendall coroutines of the Loop, which return a
+new bytes object for every read, with the SocketTransport that reads into a
+preallocated buffer and writes queued data with sendmsg.
+
+Usage: python bench_transports.py [MEGABYTES] [CHUNK_KB]
+"""
+
+import socket
+import sys
+import time
+
+from future import Future
+from loop import Loop
+from transports import Protocol, connect, serve
+from wait import ensure_future, gather
+
+
+def sock_echo(server: socket.socket, chunk_size: int):
+    conn, _address = yield from loop.sock_accept(server)
+    while True:
+        data = yield from loop.sock_recv(conn, chunk_size)
+        if not data:
+            break
+        yield from loop.sock_sendall(conn, data)
+    conn.close()
+
+
+def sock_send(conn: socket.socket, chunk: bytes, count: int):
+    for _ in range(count):
+        yield from loop.sock_sendall(conn, chunk)
+
+
+def sock_receive(conn: socket.socket, total: int, chunk_size: int):
+    received = 0
+    while received < total:
+        data = yield from loop.sock_recv(conn, chunk_size)
+        received += len(data)
+    return received
+
+
+def sock_main(total: int, chunk_size: int):
+    server = socket.create_server(("127.0.0.1", 0))
+    server.setblocking(False)
+    ensure_future(sock_echo(server, chunk_size))
+
+    conn = yield from loop.create_connection(
+        "127.0.0.1", server.getsockname()[1]
+    )
+    count = total // chunk_size
+    _, received = yield from gather(
+        [
+            sock_send(conn, b"x" * chunk_size, count),
+            sock_receive(conn, count * chunk_size, chunk_size),
+        ]
+    )
+    conn.close()
+    server.close()
+    return received
+
+
+class EchoProtocol(Protocol):
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.transport.write(data)
+
+
+class ClientProtocol(Protocol):
+    def __init__(self, total: int):
+        self.total = total
+        self.received = 0
+        self.done = Future("received all")
+
+    def data_received(self, data):
+        self.received += len(data)
+        if self.received >= self.total:
+            self.done.set_result(self.received)
+
+
+def transport_main(total: int, chunk_size: int):
+    server = serve(EchoProtocol, "127.0.0.1", 0)
+    count = total // chunk_size
+    transport, protocol = yield from connect(
+        lambda: ClientProtocol(count * chunk_size), "127.0.0.1", server.port
+    )
+    # queue all chunks at once. they are sent with a few sendmsg calls
+    transport.writelines([b"x" * chunk_size] * count)
+    received = yield from protocol.done
+    transport.close()
+    server.close()
+    return received
+
+
+megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+chunk_size = (int(sys.argv[2]) if len(sys.argv) > 2 else 64) * 1024
+
+loop = Loop.get_current_loop()
+for main in (sock_main, transport_main):
+    start = time.perf_counter()
+    received = loop.run(main(megabytes * 2**20, chunk_size))
+    duration = time.perf_counter() - start
+    print(f"{main.__name__}: {received / 2**20 / duration:.0f} MB/s")
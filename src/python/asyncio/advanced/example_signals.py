@@ -0,0 +1,73 @@
+"""
+Drain in-flight requests on SIGTERM before stopping
+
+A server handles simulated requests that take a random time. When SIGTERM is
+received it stops accepting new requests and waits for the in-flight requests
+until a deadline. Requests that aren't done by then are cancelled. The signal
+is sent to ourselves after a short time.
+
+Run it in a shell and press Ctrl+C to send SIGINT instead.
+
+Usage: python example_signals.py [DEADLINE]
+"""
+
+import os
+import random
+import signal
+import sys
+import time
+
+from future import Future
+from loop import Loop
+from wait import ensure_future, sleep, wait
+
+
+async def handle_request(number: int) -> int:
+    await sleep(random.uniform(0.1, 1.5))
+    return number
+
+
+async def serve(stopping: Future, in_flight: set) -> int:
+    number = 0
+    while not stopping.done():
+        # accept a new request every 10ms
+        task = ensure_future(handle_request(number))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+        number += 1
+        await sleep(0.01)
+    return number
+
+
+async def main(deadline: float):
+    stopping = Future("stopping")
+    in_flight = set()
+
+    def shutdown(signum):
+        print(f"Received {signal.Signals(signum).name}. Draining requests")
+        loop.remove_signal_handler(signal.SIGTERM)
+        loop.remove_signal_handler(signal.SIGINT)
+        stopping.set_result(time.perf_counter())
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        name = signal.Signals(signum).name
+        loop.add_signal_handler(signum, name, shutdown, signum)
+    loop.call_later(1.0, "send SIGTERM", os.kill, os.getpid(), signal.SIGTERM)
+
+    accepted = await serve(stopping, in_flight)
+    received = stopping.result()
+
+    done, pending = await wait(set(in_flight), timeout=deadline)
+    for task in pending:
+        task.cancel()
+    print(
+        f"Accepted {accepted} requests. {len(done)} in-flight requests "
+        f"finished and {len(pending)} were cancelled after "
+        f"{time.perf_counter() - received:.2f}s"
+    )
+
+
+deadline = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+
+loop = Loop.get_current_loop()
+loop.run(main(deadline))
@@ -0,0 +1,53 @@
+"""
+Process results as they arrive
+
+A version of the Mastodon example using our own as_completed and wait
+functions. The servers are simulated by sleeping for a random time.
+"""
+
+import random
+import time
+
+from loop import Loop
+from wait import FIRST_COMPLETED, as_completed, sleep, wait
+
+SERVERS = [
+    "https://mastodon.social",
+    "https://norden.social",
+    "https://fosstodon.org",
+    "https://floss.social",
+    "https://osna.social",
+]
+
+
+async def get_public_feed(server: str) -> tuple[str, float]:
+    latency = random.uniform(0.1, 1.0)
+    await sleep(latency)
+    return server, latency
+
+
+async def main():
+    start = time.perf_counter()
+    feeds = [get_public_feed(server) for server in SERVERS]
+    for future in as_completed(feeds):
+        server, latency = await future
+        print(
+            f"{time.perf_counter() - start:.2f}s "
+            f"{server} responded after {latency:.2f}s"
+        )
+
+    start = time.perf_counter()
+    feeds = [get_public_feed(server) for server in SERVERS]
+    done, pending = await wait(feeds, timeout=0.5)
+    print(f"{len(done)} requests done, {len(pending)} request pending")
+
+    while pending:
+        done, pending = await wait(pending, return_when=FIRST_COMPLETED)
+        print(
+            f"{time.perf_counter() - start:.2f}s "
+            f"{len(done)} requests done, {len(pending)} request pending"
+        )
+
+
+loop = Loop.get_current_loop()
+loop.run(main())
@@ -0,0 +1,192 @@
+from enum import Enum
+from typing import Any, Callable, Generator, Optional
+
+from handle import Name
+from loop import Loop
+
+
+class CancelledError(Exception):
+    """
+    Raised if a Future is cancelled
+    """
+
+
+class FutureState(Enum):
+    PENDING = "pending"
+    DONE = "done"
+    CANCELLED = "cancelled"
+
+
+# internally the state is stored as small int. comparing them is a lot faster
+# than comparing enum members.
+_PENDING = 0
+_DONE = 1
+_CANCELLED = 2
+
+_STATES = (FutureState.PENDING, FutureState.DONE, FutureState.CANCELLED)
+
+
+class Future:
+    """Return a result in the future v10"""
+
+    # marker for Task.step to recognize futures without an isinstance check
+    _is_future = True
+
+    __slots__ = (
+        "_name",
+        "_callback",
+        "_callbacks",
+        "_state",
+        "_loop",
+        "_result",
+        "_exception",
+        # allow weak references for the task registry of the loop
+        "__weakref__",
+    )
+
+    def __init__(self, name: Name = None):
+        self._name = name
+        # most futures have a single callback only. therefore the first
+        # callback gets its own slot and the list is only created on demand
+        self._callback = None
+        self._callbacks = None
+        self._state = _PENDING
+        self._loop = Loop.get_current_loop()
+        self._result = None
+        self._exception = None
+
+    def get_name(self) -> str:
+        """
+        Get the name of the future
+
+        The name is only created when it is requested, for example for
+        debugging.
+        """
+        name = self._name
+        if name is None:
+            name = self._name = self._default_name()
+        elif callable(name):
+            name = self._name = name()
+        return name
+
+    def _default_name(self) -> str:
+        return f"{self.__class__.__name__} {hex(id(self))}"
+
+    def set_result(self, result: Any):
+        if self._state != _PENDING:
+            raise RuntimeError("Invalid Future state")
+
+        self._result = result
+        self._state = _DONE
+        if self._callback is not None:
+            self._schedule_callbacks()
+
+    def set_exception(self, exception: BaseException) -> None:
+        if self._state != _PENDING:
+            raise RuntimeError("Invalid Future state")
+
+        self._exception = exception
+        self._state = _DONE
+        if self._callback is not None:
+            self._schedule_callbacks()
+
+    def cancel(self) -> bool:
+        if self._state != _PENDING:
+            return False
+
+        self._state = _CANCELLED
+        if self._callback is not None:
+            self._schedule_callbacks()
+        return True
+
+    def result(self) -> Any:
+        state = self._state
+        if state == _DONE:
+            if self._exception is not None:
+                try:
+                    raise self._exception
+                finally:
+                    # the traceback references this frame. break the cycle
+                    # exception -> traceback -> frame -> self -> exception
+                    self = None
+            return self._result
+        if state == _CANCELLED:
+            raise CancelledError()
+        raise RuntimeError("Invalid Future state")
+
+    def exception(self) -> Optional[BaseException]:
+        state = self._state
+        if state == _DONE:
+            return self._exception
+        if state == _CANCELLED:
+            raise CancelledError()
+        raise RuntimeError("Invalid Future state")
+
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    def cancelled(self) -> bool:
+        return self._state == _CANCELLED
+
+    def add_done_callback(self, fn: Callable[["Future"], None]) -> None:
+        if self._state != _PENDING:
+            # we already have a result or are cancelled
+            self._loop.schedule(self._name, fn, self)
+        elif self._callback is None:
+            self._callback = fn
+        elif self._callbacks is None:
+            self._callbacks = [fn]
+        else:
+            self._callbacks.append(fn)
+
+    def remove_done_callback(self, fn: Callable[["Future"], None]) -> int:
+        """Remove a callback. Returns the number of removed callbacks"""
+        if self._callbacks is None:
+            # fast path for a single callback
+            if self._callback is not None and self._callback == fn:
+                self._callback = None
+                return 1
+            return 0
+
+        callbacks = [self._callback] + self._callbacks
+        remaining = [callback for callback in callbacks if callback != fn]
+        removed = len(callbacks) - len(remaining)
+        if removed:
+            # keep the order of the remaining callbacks
+            self._callback = remaining[0] if remaining else None
+            self._callbacks = remaining[1:] or None
+        return removed
+
+    def _schedule_callbacks(self) -> None:
+        # only called if there is at least one callback
+        schedule = self._loop.schedule
+        schedule(self._name, self._callback, self)
+        self._callback = None
+
+        callbacks = self._callbacks
+        if callbacks is not None:
+            # take over the list instead of copying it
+            self._callbacks = None
+            for callback in callbacks:
+                schedule(self._name, callback, self)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} name='{self.get_name()}' "
+            f"state={_STATES[self._state]} id='{hex(id(self))}'>"
+        )
+
+    def __iter__(self) -> Generator["Future", None, Any]:
+        if self._state == _PENDING:
+            yield self
+        # no need to suspend if the result is already available
+        if self._state == _DONE and self._exception is not None:
+            # raise here instead of in result. otherwise the traceback would
+            # reference this frame via f_back of the result frame
+            try:
+                raise self._exception
+            finally:
+                self = None
+        return self.result()
+
+    __await__ = __iter__
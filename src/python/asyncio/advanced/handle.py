@@ -0,0 +1,91 @@
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, Union
+
+if TYPE_CHECKING:
+    # the loop imports the handles. only needed for the annotations
+    from loop import Loop
+
+# a name or a function that returns the name on demand
+Name = Optional[Union[str, Callable[[], str]]]
+
+
+class Handle:
+    """A callback handle"""
+
+    __slots__ = ("_name", "_callback", "_args", "_cancelled")
+
+    def __init__(self, name: Name, callback: Callable, args: Iterable[Any]):
+        self._name = name
+        self._callback = callback
+        self._args = args
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        """Don't run the callback anymore"""
+        self._cancelled = True
+
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self) -> None:
+        self._callback(*self._args)
+
+    def get_name(self) -> str:
+        """
+        Get the name of the handle
+
+        The name is only created when it is requested, for example for
+        debugging. Without a name the name of the callback's owner is used.
+        """
+        name = self._name
+        if name is None:
+            owner = getattr(self._callback, "__self__", None)
+            if hasattr(owner, "get_name"):
+                return owner.get_name()
+            return self._callback.__qualname__
+        if callable(name):
+            name = self._name = name()
+        return name
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} name='{self.get_name()}' "
+            f"callback='{self._callback.__name__}'>"
+        )
+
+
+class TimerHandle(Handle):
+    """A callback handle that runs at a specific time"""
+
+    __slots__ = ("_when", "_loop", "_scheduled")
+
+    def __init__(
+        self,
+        when: float,
+        name: Name,
+        callback: Callable,
+        args: Iterable[Any],
+        loop: "Loop",
+    ):
+        super().__init__(name, callback, args)
+        self._when = when
+        self._loop = loop
+        # True while the handle is waiting in the timer heap of the loop
+        self._scheduled = False
+
+    def when(self) -> float:
+        return self._when
+
+    def cancel(self) -> None:
+        if not self._cancelled:
+            # let the loop know that it has a dead entry in its timer heap
+            self._loop._timer_handle_cancelled(self)
+        super().cancel()
+
+    def __lt__(self, other: "TimerHandle") -> bool:
+        return self._when < other._when
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} name='{self.get_name()}' "
+            f"callback='{self._callback.__name__}' when={self._when}>"
+        )
@@ -0,0 +1,141 @@
+import types
+from collections import deque
+from typing import Any, Deque, Generator
+
+from future import CancelledError, Future
+
+
+def _wake_next(waiters: Deque[Future]) -> bool:
+    # cancelled waiters are not removed from the deque when they are
+    # cancelled. they are skipped here instead, which keeps both O(1)
+    while waiters:
+        waiter = waiters.popleft()
+        if not waiter.done() and not waiter.cancelled():
+            waiter.set_result(True)
+            return True
+    return False
+
+
+class Event:
+    """
+    Notify waiting coroutines that something has happened
+    """
+
+    def __init__(self):
+        self._set = False
+        self._waiters: Deque[Future] = deque()
+
+    def is_set(self) -> bool:
+        return self._set
+
+    def set(self) -> None:
+        """Set the event and wake up all waiting coroutines"""
+        if self._set:
+            return
+
+        self._set = True
+        while _wake_next(self._waiters):
+            pass
+
+    def clear(self) -> None:
+        self._set = False
+
+    @types.coroutine
+    def wait(self) -> Generator[Any, None, bool]:
+        """Wait until the event is set"""
+        if self._set:
+            return True
+
+        waiter = Future("Event")
+        self._waiters.append(waiter)
+        return (yield from waiter)
+
+
+class Lock:
+    """
+    Mutual exclusion for coroutines
+
+    The lock is handed over to the waiting coroutines in FIFO order.
+    """
+
+    def __init__(self):
+        self._locked = False
+        self._waiters: Deque[Future] = deque()
+
+    def locked(self) -> bool:
+        return self._locked
+
+    @types.coroutine
+    def acquire(self) -> Generator[Any, None, bool]:
+        if not self._locked:
+            self._locked = True
+            return True
+
+        waiter = Future("Lock")
+        self._waiters.append(waiter)
+        try:
+            yield from waiter
+        except CancelledError:
+            if waiter.done():
+                # the lock has already been handed over to us
+                self.release()
+            raise
+        return True
+
+    def release(self) -> None:
+        if not self._locked:
+            raise RuntimeError("Lock is not acquired")
+
+        # hand over the lock directly. it stays locked for the next owner
+        if not _wake_next(self._waiters):
+            self._locked = False
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        self.release()
+
+
+class Semaphore:
+    """
+    Limit the number of coroutines accessing a resource at the same time
+    """
+
+    def __init__(self, value: int = 1):
+        if value < 0:
+            raise ValueError("Semaphore initial value must be >= 0")
+
+        self._value = value
+        self._waiters: Deque[Future] = deque()
+
+    def locked(self) -> bool:
+        return self._value == 0
+
+    @types.coroutine
+    def acquire(self) -> Generator[Any, None, bool]:
+        if self._value > 0:
+            self._value -= 1
+            return True
+
+        waiter = Future("Semaphore")
+        self._waiters.append(waiter)
+        try:
+            yield from waiter
+        except CancelledError:
+            if waiter.done():
+                # a slot has already been handed over to us
+                self.release()
+            raise
+        return True
+
+    def release(self) -> None:
+        # hand over the slot directly instead of increasing the value
+        if not _wake_next(self._waiters):
+            self._value += 1
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        self.release()
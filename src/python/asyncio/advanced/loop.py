@@ -0,0 +1,643 @@
+import concurrent.futures
+import heapq
+import logging
+import selectors
+import signal
+import socket
+import threading
+import time
+import weakref
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Generator, Optional, Tuple
+
+from handle import Handle, TimerHandle
+
+if TYPE_CHECKING:
+    # tracing imports the loop. only needed for the annotations
+    from tracing import TraceHook
+
+# seconds the remaining tasks get to finish after they are cancelled on shutdown
+DEFAULT_SHUTDOWN_TIMEOUT = 5.0
+
+logger = logging.getLogger(__name__)
+
+# rebuild the timer heap if more than this number of timers is cancelled and
+# if the cancelled timers are more than half of the heap
+MIN_CANCELLED_TIMERS = 100
+
+
+def _copy_concurrent_state(
+    concurrent_future: concurrent.futures.Future, future
+) -> None:
+    if future.cancelled():
+        return
+    if concurrent_future.cancelled():
+        future.cancel()
+    elif concurrent_future.exception() is not None:
+        future.set_exception(concurrent_future.exception())
+    else:
+        future.set_result(concurrent_future.result())
+
+
+def _ignore_signal(signum, frame) -> None:
+    # the signal is handled via the wakeup fd of the loop
+    pass
+
+
+class Loop:
+    """Loop v15"""
+
+    # every thread has its own current loop
+    _local = threading.local()
+
+    def __init__(self):
+        self._running = False
+        self._scheduled = deque()
+        # pending tasks of the loop. a task that isn't referenced anywhere
+        # else can't be resumed anymore and is freed
+        self._tasks = weakref.WeakSet()
+        self._selector = selectors.DefaultSelector()  # epoll on Linux
+        self._timers = []  # binary heap of TimerHandles
+        self._cancelled_timers = 0
+        self._clock_resolution = time.get_clock_info("monotonic").resolution
+        self._trace_hook = None
+        self._default_executor = None
+        self._signal_handlers = {}
+
+        # self-pipe for waking up the loop while it is blocked in select
+        self._selecting = False
+        self._ssock, self._csock = socket.socketpair()
+        self._ssock.setblocking(False)
+        self._csock.setblocking(False)
+        self.add_reader(
+            self._ssock.fileno(), "read_from_self", self._read_from_self
+        )
+
+    @classmethod
+    def get_current_loop(cls) -> "Loop":
+        """Get the loop of the current thread. It is created on first use"""
+        try:
+            return cls._local.loop
+        except AttributeError:
+            loop = cls._local.loop = Loop()
+            return loop
+
+    def set_trace_hook(self, hook: Optional["TraceHook"]) -> None:
+        """
+        Set a hook for tracing the steps/ticks of the loop
+
+        Pass None to disable tracing.
+        """
+        self._trace_hook = hook
+
+    def _read_from_self(self) -> None:
+        try:
+            while True:
+                data = self._ssock.recv(4096)
+                if not data:
+                    break
+                if self._signal_handlers:
+                    self._process_signals(data)
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _process_signals(self, data: bytes) -> None:
+        # the wakeup fd receives the number of every signal as a single byte.
+        # wakeups from _write_to_self are zero bytes
+        for signum in data:
+            handle = self._signal_handlers.get(signum)
+            if handle is not None:
+                self._scheduled.append(handle)
+
+    def _write_to_self(self) -> None:
+        try:
+            self._csock.send(b"\0")
+        except OSError:
+            # the buffer is full. the loop will wake up anyway
+            pass
+
+    def add_signal_handler(
+        self, signum: int, name: str, callback: Callable, *args: Any
+    ) -> Handle:
+        """
+        Run a callback as scheduled Handle when the signal is received
+
+        The signal wakes up the loop via the self-pipe. The callback doesn't
+        interrupt the running code like a plain Python signal handler. It runs
+        in the next step/tick like every other Handle. Must be called from the
+        main thread.
+        """
+        if not self._signal_handlers:
+            # the C level signal handler writes the signal number to this fd
+            signal.set_wakeup_fd(self._csock.fileno())
+
+        handle = Handle(name, callback, args)
+        self._signal_handlers[signum] = handle
+        try:
+            # only the wakeup fd is of interest. but the C level handler is
+            # only installed together with a Python handler
+            signal.signal(signum, _ignore_signal)
+        except (OSError, RuntimeError, ValueError):
+            del self._signal_handlers[signum]
+            if not self._signal_handlers:
+                signal.set_wakeup_fd(-1)
+            raise
+        return handle
+
+    def remove_signal_handler(self, signum: int) -> bool:
+        """Restore the default handling of a signal"""
+        handle = self._signal_handlers.pop(signum, None)
+        if handle is None:
+            return False
+
+        handle.cancel()
+        if signum == signal.SIGINT:
+            signal.signal(signum, signal.default_int_handler)
+        else:
+            signal.signal(signum, signal.SIG_DFL)
+        if not self._signal_handlers:
+            signal.set_wakeup_fd(-1)
+        return True
+
+    def time(self) -> float:
+        """Current time of the loop's clock"""
+        return time.monotonic()
+
+    def call_at(
+        self, when: float, name: str, callback: Callable, *args: Any
+    ) -> TimerHandle:
+        """Schedule a callback to run at a specific time of the loop's clock"""
+        handle = TimerHandle(when, name, callback, args, self)
+        handle._scheduled = True
+        heapq.heappush(self._timers, handle)
+        return handle
+
+    def call_later(
+        self, delay: float, name: str, callback: Callable, *args: Any
+    ) -> TimerHandle:
+        """Schedule a callback to run after delay seconds"""
+        return self.call_at(self.time() + delay, name, callback, *args)
+
+    def _timer_handle_cancelled(self, handle: TimerHandle) -> None:
+        if handle._scheduled:
+            self._cancelled_timers += 1
+
+    def _remove_cancelled_timers(self) -> None:
+        # cancelled timers are not removed from the heap immediately because
+        # removing an arbitrary entry is O(n). they are dropped when they reach
+        # the top of the heap or all at once if they fill up the heap.
+        timers = self._timers
+        if (
+            self._cancelled_timers > MIN_CANCELLED_TIMERS
+            and self._cancelled_timers > len(timers) // 2
+        ):
+            active = []
+            for handle in timers:
+                if handle._cancelled:
+                    handle._scheduled = False
+                else:
+                    active.append(handle)
+            heapq.heapify(active)
+            self._timers = active
+            self._cancelled_timers = 0
+        else:
+            while timers and timers[0]._cancelled:
+                handle = heapq.heappop(timers)
+                handle._scheduled = False
+                self._cancelled_timers -= 1
+
+    def add_reader(
+        self, fd: int, name: str, callback: Callable, *args: Any
+    ) -> Handle:
+        """Run a callback every step/tick the file descriptor is readable"""
+        handle = Handle(name, callback, args)
+        try:
+            key = self._selector.get_key(fd)
+        except KeyError:
+            self._selector.register(fd, selectors.EVENT_READ, (handle, None))
+        else:
+            _reader, writer = key.data
+            self._selector.modify(
+                fd, key.events | selectors.EVENT_READ, (handle, writer)
+            )
+        return handle
+
+    def remove_reader(self, fd: int) -> bool:
+        """Stop watching the file descriptor for reading"""
+        try:
+            key = self._selector.get_key(fd)
+        except KeyError:
+            return False
+
+        reader, writer = key.data
+        mask = key.events & ~selectors.EVENT_READ
+        if mask:
+            self._selector.modify(fd, mask, (None, writer))
+        else:
+            self._selector.unregister(fd)
+        return reader is not None
+
+    def add_writer(
+        self, fd: int, name: str, callback: Callable, *args: Any
+    ) -> Handle:
+        """Run a callback every step/tick the file descriptor is writable"""
+        handle = Handle(name, callback, args)
+        try:
+            key = self._selector.get_key(fd)
+        except KeyError:
+            self._selector.register(fd, selectors.EVENT_WRITE, (None, handle))
+        else:
+            reader, _writer = key.data
+            self._selector.modify(
+                fd, key.events | selectors.EVENT_WRITE, (reader, handle)
+            )
+        return handle
+
+    def remove_writer(self, fd: int) -> bool:
+        """Stop watching the file descriptor for writing"""
+        try:
+            key = self._selector.get_key(fd)
+        except KeyError:
+            return False
+
+        reader, writer = key.data
+        mask = key.events & ~selectors.EVENT_WRITE
+        if mask:
+            self._selector.modify(fd, mask, (reader, None))
+        else:
+            self._selector.unregister(fd)
+        return writer is not None
+
+    def create_connection(self, host: str, port: int):
+        """
+        Open a TCP connection to host and port
+
+        Returns a Future for the connected non-blocking socket.
+        """
+        sock = socket.socket()
+        sock.setblocking(False)
+        return self.sock_connect(sock, (host, port))
+
+    def sock_connect(self, sock: socket.socket, address: Tuple[str, int]):
+        """Connect a non-blocking socket. Returns a Future for the socket"""
+        from future import Future  # avoid cyclic dependency
+
+        future = Future("sock_connect")
+        try:
+            sock.connect(address)
+        except (BlockingIOError, InterruptedError):
+            # connection is established in the background. the socket becomes
+            # writable when it is done
+            self.add_writer(
+                sock.fileno(), "sock_connect", self._sock_connect, future, sock
+            )
+        except OSError as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(sock)
+        return future
+
+    def _sock_connect(self, future, sock: socket.socket) -> None:
+        self.remove_writer(sock.fileno())
+        if future.cancelled():
+            return
+
+        error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if error:
+            future.set_exception(OSError(error, "Connect call failed"))
+        else:
+            future.set_result(sock)
+
+    def sock_accept(self, sock: socket.socket):
+        """
+        Accept a connection on a listening socket
+
+        Returns a Future for a (socket, address) tuple.
+        """
+        from future import Future  # avoid cyclic dependency
+
+        future = Future("sock_accept")
+        self.add_reader(
+            sock.fileno(), "sock_accept", self._sock_accept, future, sock
+        )
+        return future
+
+    def _sock_accept(self, future, sock: socket.socket) -> None:
+        if future.cancelled():
+            self.remove_reader(sock.fileno())
+            return
+
+        try:
+            conn, address = sock.accept()
+        except (BlockingIOError, InterruptedError):
+            return  # try again in the next step/tick
+        except OSError as exc:
+            self.remove_reader(sock.fileno())
+            future.set_exception(exc)
+        else:
+            self.remove_reader(sock.fileno())
+            conn.setblocking(False)
+            future.set_result((conn, address))
+
+    def sock_recv(self, sock: socket.socket, nbytes: int):
+        """Receive up to nbytes. Returns a Future for the received data"""
+        from future import Future  # avoid cyclic dependency
+
+        future = Future("sock_recv")
+        self.add_reader(
+            sock.fileno(), "sock_recv", self._sock_recv, future, sock, nbytes
+        )
+        return future
+
+    def _sock_recv(self, future, sock: socket.socket, nbytes: int) -> None:
+        if future.cancelled():
+            self.remove_reader(sock.fileno())
+            return
+
+        try:
+            data = sock.recv(nbytes)
+        except (BlockingIOError, InterruptedError):
+            return  # try again in the next step/tick
+        except OSError as exc:
+            self.remove_reader(sock.fileno())
+            future.set_exception(exc)
+        else:
+            self.remove_reader(sock.fileno())
+            future.set_result(data)
+
+    def sock_sendall(self, sock: socket.socket, data: bytes):
+        """Send all data. Returns a Future that is done when all data is sent"""
+        from future import Future  # avoid cyclic dependency
+
+        future = Future("sock_sendall")
+        view = memoryview(data)
+        try:
+            sent = sock.send(view)
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError as exc:
+            future.set_exception(exc)
+            return future
+
+        if sent == len(view):
+            future.set_result(None)
+        else:
+            # the socket buffer is full. send the rest when it is writable
+            self.add_writer(
+                sock.fileno(),
+                "sock_sendall",
+                self._sock_sendall,
+                future,
+                sock,
+                view[sent:],
+            )
+        return future
+
+    def _sock_sendall(self, future, sock: socket.socket, view) -> None:
+        if future.cancelled():
+            self.remove_writer(sock.fileno())
+            return
+
+        try:
+            sent = sock.send(view)
+        except (BlockingIOError, InterruptedError):
+            return  # try again in the next step/tick
+        except OSError as exc:
+            self.remove_writer(sock.fileno())
+            future.set_exception(exc)
+            return
+
+        if sent == len(view):
+            self.remove_writer(sock.fileno())
+            future.set_result(None)
+        else:
+            # replace the handle to send the remaining data next time
+            self.add_writer(
+                sock.fileno(),
+                "sock_sendall",
+                self._sock_sendall,
+                future,
+                sock,
+                view[sent:],
+            )
+
+    def run_step(self) -> None:
+        """Run a single step/tick of the loop"""
+        self._remove_cancelled_timers()
+
+        # must be set before checking for scheduled handles. otherwise a
+        # handle scheduled from another thread in between would not wake us up
+        self._selecting = True
+        if self._scheduled:
+            timeout = 0  # just get the sockets with data
+        elif self._timers:
+            # wait until data is available or the next timer is due
+            timeout = max(0, self._timers[0]._when - self.time())
+        else:
+            timeout = None  # wait forever until data is available
+
+        # wait and block for data depending on the timeout
+        # and schedule the handles of all ready file descriptors
+        events = self._selector.select(timeout)
+        self._selecting = False
+        for key, mask in events:
+            reader, writer = key.data
+            if mask & selectors.EVENT_READ and reader is not None:
+                self._scheduled.append(reader)
+            if mask & selectors.EVENT_WRITE and writer is not None:
+                self._scheduled.append(writer)
+
+        # schedule all timers that are due
+        timers = self._timers
+        end_time = self.time() + self._clock_resolution
+        while timers and timers[0]._when <= end_time:
+            handle = heapq.heappop(timers)
+            handle._scheduled = False
+            if handle._cancelled:
+                self._cancelled_timers -= 1
+            else:
+                self._scheduled.append(handle)
+
+        # execute all current known handles only.
+        # not the ones added while running the handle callbacks.
+        scheduled, self._scheduled = self._scheduled, deque()
+
+        hook = self._trace_hook
+        if hook is None:
+            while scheduled:
+                handle = scheduled.popleft()  # fifo: extract first item
+                if not handle._cancelled:
+                    handle.run()
+        else:
+            self._run_traced(hook, scheduled)
+
+    def _run_traced(self, hook: "TraceHook", scheduled: deque) -> None:
+        count = len(scheduled)
+        hook.on_tick_start(self, scheduled)
+        tick_start = time.perf_counter()
+
+        while scheduled:
+            handle = scheduled.popleft()  # fifo: extract first item
+            if not handle._cancelled:
+                start = time.perf_counter()
+                handle.run()
+                hook.on_handle_run(self, handle, time.perf_counter() - start)
+
+        hook.on_tick_end(self, count, time.perf_counter() - tick_start)
+
+    def run_loop(self) -> None:
+        """Run the loop"""
+        self._running = True
+        while self._running:
+            self.run_step()
+
+    def run(
+        self,
+        coroutine: Generator[Any, None, Any],
+        shutdown_timeout: float = DEFAULT_SHUTDOWN_TIMEOUT,
+    ) -> Any:
+        """
+        Run a coroutine until it is done/completed
+
+        Afterwards the handles that are ready are run and all remaining tasks
+        are cancelled. They get shutdown_timeout seconds to finish. Tasks that
+        are still pending then are reported as leaked.
+        """
+        from task import Task  # avoid cyclic dependency
+
+        # create a root task for our coroutine
+        # the tasks gets scheduled immediately in its constructor
+        task = Task(coroutine, "Initial Task")
+        task.add_done_callback(self._done)
+        try:
+            self.run_loop()
+        finally:
+            self._shutdown(shutdown_timeout)
+        return task.result()
+
+    def _shutdown(self, timeout: float) -> None:
+        deadline = self.time() + timeout
+
+        # run the handles that are ready already, for example done callbacks
+        # of the tasks that just finished
+        if self._scheduled:
+            self.run_step()
+
+        for task in list(self._tasks):
+            task.cancel()
+        self._run_until(deadline, lambda: not self._tasks)
+
+        for task in self._tasks:
+            logger.warning("Task %r is still pending after shutdown", task)
+
+        if self._default_executor is not None:
+            self._default_executor.shutdown(wait=False, cancel_futures=True)
+            self._default_executor = None
+
+    def _run_until(self, deadline: float, done: Callable[[], bool]) -> None:
+        # wake up from select at the deadline at the latest
+        timeout_handle = self.call_at(deadline, "deadline", lambda: None)
+        try:
+            while not done() and self.time() < deadline:
+                self.run_step()
+        finally:
+            timeout_handle.cancel()
+
+    def close(self) -> None:
+        """
+        Close the loop and release its resources
+
+        A new loop is created for the current thread if it is requested
+        afterwards.
+        """
+        if self._running:
+            raise RuntimeError("Can't close a running loop")
+
+        for signum in list(self._signal_handlers):
+            self.remove_signal_handler(signum)
+        if self._default_executor is not None:
+            self._default_executor.shutdown(wait=False, cancel_futures=True)
+            self._default_executor = None
+        self._scheduled.clear()
+        self._timers.clear()
+        self._selector.close()
+        self._ssock.close()
+        self._csock.close()
+        if getattr(Loop._local, "loop", None) is self:
+            del Loop._local.loop
+
+    def stop(self) -> None:
+        """Stop running the loop"""
+        self._running = False
+
+    def schedule(self, name: str, callback: Callable, *args: Any) -> Handle:
+        """Schedule a callback for the next step/tick"""
+        handle = Handle(name, callback, args)
+        self._scheduled.append(handle)
+        if self._selecting:
+            # we are called from another thread, for example via
+            # Future.set_result, while the loop is waiting in select
+            self._write_to_self()
+        return handle
+
+    def call_soon_threadsafe(
+        self, name: str, callback: Callable, *args: Any
+    ) -> Handle:
+        """
+        Schedule a callback for the next step/tick from another thread
+
+        Other than schedule the loop is always woken up.
+        """
+        handle = Handle(name, callback, args)
+        self._scheduled.append(handle)  # deque.append is thread-safe
+        self._write_to_self()
+        return handle
+
+    def run_in_executor(
+        self,
+        executor: Optional[concurrent.futures.Executor],
+        func: Callable,
+        *args: Any,
+    ):
+        """
+        Run a blocking function in an executor
+
+        If executor is None a ThreadPoolExecutor is created on first use.
+        Returns a Future for the result of the function.
+        """
+        from future import Future  # avoid cyclic dependency
+
+        if executor is None:
+            executor = self._default_executor
+            if executor is None:
+                executor = self._default_executor = (
+                    concurrent.futures.ThreadPoolExecutor(
+                        thread_name_prefix="Loop"
+                    )
+                )
+
+        # not every callable has a __qualname__, for example functools.partial
+        future = Future(
+            lambda: "run_in_executor "
+            + getattr(func, "__qualname__", repr(func))
+        )
+        concurrent_future = executor.submit(func, *args)
+        # the done callback runs in the worker thread
+        concurrent_future.add_done_callback(
+            lambda _: self.call_soon_threadsafe(
+                "run_in_executor",
+                _copy_concurrent_state,
+                concurrent_future,
+                future,
+            )
+        )
+
+        def _cancel(_future):
+            if future.cancelled():
+                concurrent_future.cancel()
+
+        future.add_done_callback(_cancel)
+        return future
+
+    def _done(self, _future) -> None:
+        self.stop()
@@ -0,0 +1,210 @@
+import bisect
+import logging
+import math
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from handle import Handle
+from loop import Loop
+from tracing import TraceHook
+
+logger = logging.getLogger(__name__)
+
+# upper bounds of the histogram buckets like the Prometheus defaults
+TICK_DURATION_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+)
+HANDLES_PER_TICK_BUCKETS = (1, 2, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+
+class Histogram:
+    """
+    Count observed values in buckets
+
+    A value is counted in the first bucket whose upper bound is greater than
+    or equal to it. Larger values are counted in an additional +Inf bucket.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[int]:
+        """Return the counts of values less or equal to every upper bound"""
+        counts = []
+        total = 0
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts
+
+    def as_dict(self) -> Dict[str, Any]:
+        bounds = [*self.buckets, math.inf]
+        return {
+            "buckets": dict(zip(bounds, self.cumulative())),
+            "count": self.count,
+            "sum": self.sum,
+        }
+
+
+class LoopMetrics(TraceHook):
+    """
+    Collect metrics of a Loop
+
+    Counts the ticks and handles, records histograms of the handles per tick
+    and of the tick durations and warns about handles that run longer than
+    slow_callback_duration seconds. Pass it to Loop.set_trace_hook to enable
+    it and pass None to disable it again.
+
+    Snapshots read the state of the loop and must be taken in the thread of
+    the loop. For a loop of another thread schedule the snapshot in that
+    thread, for example with loop.call_soon_threadsafe.
+    """
+
+    def __init__(self, slow_callback_duration: float = 0.1):
+        # the loop that runs the hook. it may be created in another thread,
+        # for example for a shard of a ShardedRunner
+        self._loop: Optional[Loop] = None
+        self.slow_callback_duration = slow_callback_duration
+        self.ticks = 0
+        self.handles = 0
+        self.slow_callbacks = 0
+        self.handles_per_tick = Histogram(HANDLES_PER_TICK_BUCKETS)
+        self.tick_duration = Histogram(TICK_DURATION_BUCKETS)
+
+    def on_tick_start(self, loop: Loop, handles: Deque[Handle]) -> None:
+        self._loop = loop
+        # the ready queue of the loop has been taken over for this tick
+        self.handles_per_tick.observe(len(handles))
+
+    def on_handle_run(
+        self, loop: Loop, handle: Handle, duration: float
+    ) -> None:
+        if duration >= self.slow_callback_duration:
+            self.slow_callbacks += 1
+            logger.warning("Executing %r took %.3f seconds", handle, duration)
+
+    def on_tick_end(self, loop: Loop, count: int, duration: float) -> None:
+        self.ticks += 1
+        self.handles += count
+        self.tick_duration.observe(duration)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return a snapshot of the metrics as a plain dict
+
+        Must be called in the thread of the loop that runs the hook.
+        """
+        return {
+            "ticks": self.ticks,
+            "handles": self.handles,
+            "slow_callbacks": self.slow_callbacks,
+            **self._loop_gauges(),
+            "handles_per_tick": self.handles_per_tick.as_dict(),
+            "tick_duration_seconds": self.tick_duration.as_dict(),
+        }
+
+    def _loop_gauges(self) -> Dict[str, int]:
+        loop = self._loop
+        if loop is None:
+            # the hook hasn't run yet. the loop is unknown
+            return {
+                "ready_queue_depth": 0,
+                "timers": 0,
+                "pending_tasks": 0,
+                "pending_futures": 0,
+            }
+
+        # not thread-safe. the WeakSet must not change while it is copied
+        tasks = list(loop._tasks)
+        # futures don't register themselves at the loop. count the distinct
+        # futures the pending tasks are waiting for instead
+        waited_for = {
+            id(task._fut_waiter)
+            for task in tasks
+            if task._fut_waiter is not None
+        }
+        return {
+            "ready_queue_depth": len(loop._scheduled),
+            "timers": len(loop._timers) - loop._cancelled_timers,
+            "pending_tasks": len(tasks),
+            "pending_futures": len(waited_for),
+        }
+
+    def to_prometheus(self, prefix: str = "loop") -> str:
+        """
+        Return a snapshot of the metrics in the Prometheus text format
+
+        Must be called in the thread of the loop that runs the hook.
+        """
+        snapshot = self.as_dict()
+        lines = []
+
+        def metric(name: str, kind: str, description: str, value: Any) -> None:
+            lines.append(f"# HELP {prefix}_{name} {description}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.append(f"{prefix}_{name} {value}")
+
+        def histogram(
+            name: str, description: str, values: Dict[str, Any]
+        ) -> None:
+            lines.append(f"# HELP {prefix}_{name} {description}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for bound, count in values["buckets"].items():
+                le = "+Inf" if bound == math.inf else repr(bound)
+                lines.append(f'{prefix}_{name}_bucket{{le="{le}"}} {count}')
+            lines.append(f"{prefix}_{name}_sum {values['sum']}")
+            lines.append(f"{prefix}_{name}_count {values['count']}")
+
+        metric("ticks_total", "counter", "Steps/ticks run", snapshot["ticks"])
+        metric("handles_total", "counter", "Handles run", snapshot["handles"])
+        metric(
+            "slow_callbacks_total",
+            "counter",
+            "Handles that took longer than the slow callback duration",
+            snapshot["slow_callbacks"],
+        )
+        metric(
+            "ready_queue_depth",
+            "gauge",
+            "Handles ready to run in the next step/tick",
+            snapshot["ready_queue_depth"],
+        )
+        metric("timers", "gauge", "Scheduled timers", snapshot["timers"])
+        metric(
+            "pending_tasks",
+            "gauge",
+            "Pending tasks",
+            snapshot["pending_tasks"],
+        )
+        metric(
+            "pending_futures",
+            "gauge",
+            "Futures the pending tasks are waiting for",
+            snapshot["pending_futures"],
+        )
+        histogram(
+            "handles_per_tick",
+            "Handles run per step/tick",
+            snapshot["handles_per_tick"],
+        )
+        histogram(
+            "tick_duration_seconds",
+            "Duration of the steps/ticks",
+            snapshot["tick_duration_seconds"],
+        )
+        return "\n".join(lines) + "\n"
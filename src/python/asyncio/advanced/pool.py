@@ -0,0 +1,182 @@
+import types
+from collections import deque
+from typing import Any, Deque, Dict, Generator, Optional, Tuple
+
+from future import CancelledError, Future
+from handle import TimerHandle
+from loop import Loop
+from streams import StreamReader, StreamWriter, open_connection
+from wait import ensure_future
+
+Key = Tuple[str, int]
+
+
+class Connection:
+    """
+    A pooled connection to a host
+
+    Use reader and writer to communicate with the host and pass the
+    connection back to ConnectionPool.release afterwards.
+    """
+
+    def __init__(self, key: Key, reader: StreamReader, writer: StreamWriter):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self._idle_handle: Optional[TimerHandle] = None
+
+    def is_healthy(self) -> bool:
+        """
+        Check if the connection can be reused
+
+        The connection is unusable if it is closed, the host has closed its
+        side of the connection or unread data of a previous request is left.
+        """
+        reader = self.reader
+        return (
+            not self.writer.is_closing()
+            and not reader._eof
+            and not reader._buffer
+            and reader._exception is None
+        )
+
+    def close(self) -> None:
+        self.writer.close()
+
+    def __repr__(self) -> str:
+        return f"<Connection host='{self.key[0]}' port={self.key[1]}>"
+
+
+class ConnectionPool:
+    """
+    Reuse connections to the same hosts
+
+    At most limit_per_host connections are open per host. If all of them are
+    in use acquire waits until a connection is released. The waiters get the
+    released connections in FIFO order. Idle connections are closed after
+    idle_timeout seconds.
+    """
+
+    def __init__(self, limit_per_host: int = 10, idle_timeout: float = 30.0):
+        self._loop = Loop.get_current_loop()
+        self._limit = limit_per_host
+        self._idle_timeout = idle_timeout
+        self._idle: Dict[Key, Deque[Connection]] = {}
+        self._waiters: Dict[Key, Deque[Future]] = {}
+        # number of idle, used and connecting connections per host
+        self._open: Dict[Key, int] = {}
+
+    @types.coroutine
+    def acquire(self, host: str, port: int) -> Generator[Any, None, Connection]:
+        """
+        Get a connection to host and port
+
+        Waits until a connection is available if limit_per_host connections
+        are in use already.
+        """
+        key = (host, port)
+        idle = self._idle.get(key)
+        while idle:
+            # the most recently used connection is the least likely to be
+            # closed by the host
+            connection = idle.pop()
+            connection._idle_handle.cancel()
+            if connection.is_healthy():
+                return connection
+            self._discard(connection)
+
+        if self._open.get(key, 0) < self._limit:
+            future = self._connect(key)
+        else:
+            future = Future(f"ConnectionPool waiter for {host}:{port}")
+            self._waiters.setdefault(key, deque()).append(future)
+
+        try:
+            return (yield from future)
+        except CancelledError:
+            if future.done() and future.exception() is None:
+                # the connection has already been handed over to us
+                self.release(future.result())
+            raise
+
+    def _connect(self, key: Key, waiter: Future = None) -> Future:
+        self._open[key] = self._open.get(key, 0) + 1
+        task = ensure_future(self._open_connection(key))
+        if waiter is not None:
+            task.add_done_callback(lambda _: self._pass_to_waiter(task, waiter))
+        return task
+
+    @types.coroutine
+    def _open_connection(self, key: Key) -> Generator[Any, None, Connection]:
+        try:
+            reader, writer = yield from open_connection(*key)
+        except BaseException:
+            self._open[key] -= 1
+            waiter = self._next_waiter(key)
+            if waiter is not None:
+                # let the next waiter try again with the free slot
+                self._connect(key, waiter)
+            raise
+        return Connection(key, reader, writer)
+
+    def _pass_to_waiter(self, task: Future, waiter: Future) -> None:
+        if waiter.cancelled():
+            if not task.cancelled() and task.exception() is None:
+                self.release(task.result())
+        elif task.cancelled():
+            waiter.cancel()
+        elif task.exception() is not None:
+            waiter.set_exception(task.exception())
+        else:
+            waiter.set_result(task.result())
+
+    def _next_waiter(self, key: Key) -> Optional[Future]:
+        waiters = self._waiters.get(key)
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.cancelled():
+                return waiter
+        return None
+
+    def release(self, connection: Connection, reuse: bool = True) -> None:
+        """
+        Pass a connection back to the pool
+
+        With reuse False, for example after an error, the connection is
+        closed.
+        """
+        key = connection.key
+        if not reuse or not connection.is_healthy():
+            self._discard(connection)
+            waiter = self._next_waiter(key)
+            if waiter is not None:
+                # the slot of the closed connection is free again
+                self._connect(key, waiter)
+            return
+
+        waiter = self._next_waiter(key)
+        if waiter is not None:
+            # hand over the connection directly
+            waiter.set_result(connection)
+            return
+
+        connection._idle_handle = self._loop.call_later(
+            self._idle_timeout, "ConnectionPool idle", self._expire, connection
+        )
+        self._idle.setdefault(key, deque()).append(connection)
+
+    def _discard(self, connection: Connection) -> None:
+        connection.close()
+        self._open[connection.key] -= 1
+
+    def _expire(self, connection: Connection) -> None:
+        self._idle[connection.key].remove(connection)
+        self._discard(connection)
+
+    def close(self) -> None:
+        """Close all idle connections"""
+        for idle in self._idle.values():
+            while idle:
+                connection = idle.pop()
+                connection._idle_handle.cancel()
+                self._discard(connection)
@@ -0,0 +1,218 @@
+import functools
+import os
+import signal
+import subprocess
+import threading
+import types
+from typing import Any, Generator, Optional, Tuple
+
+from future import Future
+from loop import Loop
+from streams import DEFAULT_LIMIT, StreamReader
+from wait import _set_result_unless_cancelled, gather
+
+PIPE = subprocess.PIPE
+DEVNULL = subprocess.DEVNULL
+STDOUT = subprocess.STDOUT
+
+PIPE_BUFFER_SIZE = 64 * 1024
+
+
+class _PipeReader:
+    """
+    Read from a non-blocking pipe into a StreamReader
+
+    Like the SocketTransport the data is read into a preallocated buffer.
+    """
+
+    def __init__(self, pipe, reader: StreamReader):
+        self._loop = Loop.get_current_loop()
+        self._pipe = pipe
+        self._fd = pipe.fileno()
+        self._reader = reader
+        self._view = memoryview(bytearray(PIPE_BUFFER_SIZE))
+        self._reading = False
+        self._closed = False
+        os.set_blocking(self._fd, False)
+        reader.set_transport(self)
+        self.resume_reading()
+
+    def pause_reading(self) -> None:
+        if self._reading:
+            self._reading = False
+            self._loop.remove_reader(self._fd)
+
+    def resume_reading(self) -> None:
+        if not self._reading and not self._closed:
+            self._reading = True
+            self._loop.add_reader(self._fd, "pipe read", self._read_ready)
+
+    def _read_ready(self) -> None:
+        try:
+            received = os.readv(self._fd, [self._view])
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as exc:
+            self.close()
+            self._reader.set_exception(exc)
+            return
+
+        if received:
+            self._reader.feed_data(self._view[:received])
+        else:
+            self.close()
+            self._reader.feed_eof()
+
+    def close(self) -> None:
+        if not self._closed:
+            self.pause_reading()
+            self._closed = True
+            self._pipe.close()
+
+
+def _watch_pidfd(pid: int, exited: Future) -> bool:
+    # a pidfd gets readable when the process exits. available since linux 5.3
+    try:
+        pidfd = os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        return False
+
+    loop = Loop.get_current_loop()
+
+    def _on_exit():
+        loop.remove_reader(pidfd)
+        os.close(pidfd)
+        _, status = os.waitpid(pid, 0)
+        _set_result_unless_cancelled(exited, os.waitstatus_to_exitcode(status))
+
+    loop.add_reader(pidfd, "process exit", _on_exit)
+    return True
+
+
+def _watch_thread(pid: int, exited: Future) -> None:
+    # fallback for systems without pidfd. block in waitpid in a thread
+    loop = Loop.get_current_loop()
+
+    def _wait():
+        _, status = os.waitpid(pid, 0)
+        loop.call_soon_threadsafe(
+            "process exit",
+            _set_result_unless_cancelled,
+            exited,
+            os.waitstatus_to_exitcode(status),
+        )
+
+    threading.Thread(target=_wait, name=f"waitpid {pid}", daemon=True).start()
+
+
+@types.coroutine
+def _read_all(reader: Optional[StreamReader]) -> Generator[Any, None, bytes]:
+    if reader is None:
+        return None
+    return (yield from reader.read())
+
+
+class Process:
+    """
+    A child process started by create_subprocess_exec
+
+    stdout and stderr are StreamReaders if PIPE has been passed for them.
+    """
+
+    def __init__(self, popen: subprocess.Popen, limit: int):
+        self._popen = popen
+        self.pid = popen.pid
+        self.stdin = popen.stdin
+        self.stdout = self._pipe_reader(popen.stdout, limit)
+        self.stderr = self._pipe_reader(popen.stderr, limit)
+        self._exited = Future(f"Process {self.pid} exited")
+        self._exited.add_done_callback(self._on_exit)
+        if not _watch_pidfd(self.pid, self._exited):
+            _watch_thread(self.pid, self._exited)
+
+    @staticmethod
+    def _pipe_reader(pipe, limit: int) -> Optional[StreamReader]:
+        if pipe is None:
+            return None
+        reader = StreamReader(limit)
+        _PipeReader(pipe, reader)
+        return reader
+
+    def _on_exit(self, exited: Future) -> None:
+        # the exit status has already been collected by waitpid
+        self._popen.returncode = exited.result()
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self._popen.returncode
+
+    def send_signal(self, signum: int) -> None:
+        # don't use the methods of Popen. they may reap the process by calling
+        # waitpid before our watcher does
+        if self._popen.returncode is None:
+            os.kill(self.pid, signum)
+
+    def terminate(self) -> None:
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        self.send_signal(signal.SIGKILL)
+
+    @types.coroutine
+    def wait(self) -> Generator[Any, None, int]:
+        """Wait for the process to exit and return its exit code"""
+        if self._popen.returncode is not None:
+            return self._popen.returncode
+
+        # every caller gets its own future. cancelling a waiting task must
+        # not cancel the exit of the process for everyone else
+        waiter = Future(f"Process {self.pid} wait")
+        self._exited.add_done_callback(
+            lambda exited: _set_result_unless_cancelled(waiter, exited.result())
+        )
+        return (yield from waiter)
+
+    @types.coroutine
+    def communicate(self) -> Generator[Any, None, Tuple[bytes, bytes]]:
+        """Read stdout and stderr until the end and wait for the exit"""
+        # read both pipes concurrently. otherwise the child may block when
+        # the buffer of the other pipe is full
+        stdout, stderr = yield from gather(
+            [_read_all(self.stdout), _read_all(self.stderr)]
+        )
+        yield from self.wait()
+        return stdout, stderr
+
+
+@types.coroutine
+def create_subprocess_exec(
+    program: str,
+    *args: str,
+    stdin: Any = None,
+    stdout: Any = None,
+    stderr: Any = None,
+    limit: int = DEFAULT_LIMIT,
+    **kwargs: Any,
+) -> Generator[Any, None, Process]:
+    """
+    Start a child process
+
+    The output of stdout and stderr is read without blocking the loop if PIPE
+    is passed for them. Passing PIPE for stdin returns a blocking pipe.
+    """
+    # fork and exec block until the program has been started. do it in a
+    # thread to keep the loop running while many processes are started
+    loop = Loop.get_current_loop()
+    popen = yield from loop.run_in_executor(
+        None,
+        functools.partial(
+            subprocess.Popen,
+            [program, *args],
+            stdin=stdin,
+            stdout=stdout,
+            stderr=stderr,
+            bufsize=0,
+            **kwargs,
+        ),
+    )
+    return Process(popen, limit)
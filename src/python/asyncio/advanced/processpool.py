@@ -0,0 +1,116 @@
+import concurrent.futures
+import types
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Generator, Iterable, List, Optional, Tuple
+
+from future import Future
+from loop import Loop
+from wait import ensure_future, gather
+
+
+def _run_chunk(func: Callable, chunk: List[Any]) -> List[Any]:
+    # runs in the worker process. one round-trip for the whole chunk
+    return [func(item) for item in chunk]
+
+
+def _run_shared(func: Callable, *args: Any) -> Tuple[str, int]:
+    # runs in the worker process. only the name and size of the shared memory
+    # block are pickled and sent back instead of the result itself
+    data = memoryview(func(*args)).cast("B")
+    shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+    shm.buf[: data.nbytes] = data
+    # the block is owned by the main process from now on. don't let the
+    # resource tracker of the worker remove it when the worker exits
+    resource_tracker.unregister(shm._name, "shared_memory")
+    shm.close()
+    return shm.name, data.nbytes
+
+
+class SharedResult:
+    """
+    A result that is passed back from a worker process via shared memory
+
+    buf is a memoryview of the result. The shared memory must be released by
+    calling close or by using the result as context manager.
+    """
+
+    def __init__(self, name: str, size: int):
+        self._shm = shared_memory.SharedMemory(name)
+        self.buf = self._shm.buf[:size]
+
+    def close(self) -> None:
+        self.buf.release()
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> "SharedResult":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+
+class ProcessPool:
+    """
+    Run CPU heavy functions in worker processes
+
+    Threads don't help for pure Python code because of the GIL. The functions
+    and their arguments must be picklable.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self._executor = concurrent.futures.ProcessPoolExecutor(workers)
+        self._loop = Loop.get_current_loop()
+
+    def submit(self, func: Callable, *args: Any) -> Future:
+        """Run func(*args) in a worker. Returns a Future for the result"""
+        return self._loop.run_in_executor(self._executor, func, *args)
+
+    def map(
+        self, func: Callable, items: Iterable[Any], chunksize: int = 1000
+    ) -> Future:
+        """
+        Call func for every item in a worker
+
+        The items are sent to the workers in chunks to avoid an inter process
+        round-trip per item. Returns a Future for the list of results.
+        """
+        return ensure_future(self._map(func, list(items), chunksize))
+
+    @types.coroutine
+    def _map(
+        self, func: Callable, items: List[Any], chunksize: int
+    ) -> Generator[Any, None, List[Any]]:
+        chunks = [
+            self.submit(_run_chunk, func, items[i : i + chunksize])
+            for i in range(0, len(items), chunksize)
+        ]
+        results = []
+        for chunk in (yield from gather(chunks)):
+            results.extend(chunk)
+        return results
+
+    def submit_shared(self, func: Callable, *args: Any) -> Future:
+        """
+        Run func(*args) in a worker and pass the result via shared memory
+
+        func must return a bytes-like object. Returns a Future for a
+        SharedResult.
+        """
+        return ensure_future(self._submit_shared(func, args))
+
+    @types.coroutine
+    def _submit_shared(
+        self, func: Callable, args: Tuple[Any, ...]
+    ) -> Generator[Any, None, SharedResult]:
+        name, size = yield from self.submit(_run_shared, func, *args)
+        return SharedResult(name, size)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self) -> "ProcessPool":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.shutdown()
@@ -0,0 +1,91 @@
+import types
+from collections import deque
+from typing import Any, Deque, Generator
+
+from future import CancelledError, Future
+from locks import _wake_next
+
+
+class QueueEmpty(Exception):
+    """
+    Raised by Queue.get_nowait if the queue is empty
+    """
+
+
+class QueueFull(Exception):
+    """
+    Raised by Queue.put_nowait if the queue is full
+    """
+
+
+class Queue:
+    """
+    A FIFO queue for passing items between coroutines
+
+    If maxsize is greater than zero put waits while the queue is full. This
+    slows down producers that are faster than their consumers (backpressure).
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self._maxsize = maxsize
+        self._items: Deque[Any] = deque()
+        self._getters: Deque[Future] = deque()
+        self._putters: Deque[Future] = deque()
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def full(self) -> bool:
+        return 0 < self._maxsize <= len(self._items)
+
+    def put_nowait(self, item: Any) -> None:
+        if self.full():
+            raise QueueFull()
+
+        self._items.append(item)
+        _wake_next(self._getters)
+
+    def get_nowait(self) -> Any:
+        if not self._items:
+            raise QueueEmpty()
+
+        item = self._items.popleft()
+        _wake_next(self._putters)
+        return item
+
+    @types.coroutine
+    def put(self, item: Any) -> Generator[Any, None, None]:
+        """Put an item into the queue. Wait while the queue is full"""
+        while self.full():
+            putter = Future("Queue put")
+            self._putters.append(putter)
+            try:
+                yield from putter
+            except CancelledError:
+                if putter.done() and not self.full():
+                    # pass on the wakeup we got
+                    _wake_next(self._putters)
+                raise
+        self.put_nowait(item)
+
+    @types.coroutine
+    def get(self) -> Generator[Any, None, Any]:
+        """Remove and return an item. Wait until an item is available"""
+        while not self._items:
+            getter = Future("Queue get")
+            self._getters.append(getter)
+            try:
+                yield from getter
+            except CancelledError:
+                if getter.done() and self._items:
+                    # pass on the wakeup we got
+                    _wake_next(self._getters)
+                raise
+        return self.get_nowait()
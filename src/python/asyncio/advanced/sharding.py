@@ -0,0 +1,97 @@
+import threading
+from typing import Any, Generator, List
+
+from future import Future
+from loop import Loop
+from task import Task
+from wait import _copy_state
+
+Coroutine = Generator[Any, None, Any]
+
+
+def chain_future(source: Future, destination: Future) -> None:
+    """
+    Copy the state of source to destination when source is done
+
+    Both futures may belong to loops running in different threads. Must be
+    called in the thread of the source's loop. Each future is only accessed in
+    the thread of its loop. If the destination is cancelled the source gets
+    cancelled too.
+    """
+
+    def _on_source_done(_future):
+        destination._loop.call_soon_threadsafe(
+            "chain_future", _copy_state, source, destination
+        )
+
+    def _on_destination_done(_future):
+        if destination.cancelled():
+            source._loop.call_soon_threadsafe("chain_future", source.cancel)
+
+    source.add_done_callback(_on_source_done)
+    destination._loop.call_soon_threadsafe(
+        "chain_future", destination.add_done_callback, _on_destination_done
+    )
+
+
+def _start_task(coroutine: Coroutine, destination: Future) -> None:
+    # runs in the thread of the shard's loop
+    chain_future(Task(coroutine), destination)
+
+
+class ShardedRunner:
+    """
+    Spread coroutines across several loops each running in its own thread
+
+    Because of the GIL only one thread runs Python code at a time. With a free
+    threaded Python build the loops run in parallel on different CPUs.
+    """
+
+    def __init__(self, shards: int):
+        self._loops: List[Loop] = []
+        self._threads: List[threading.Thread] = []
+        self._next = 0
+
+        started = threading.Barrier(shards + 1)
+        for number in range(shards):
+            thread = threading.Thread(
+                target=self._run_shard,
+                args=(started,),
+                name=f"Shard {number}",
+            )
+            thread.start()
+            self._threads.append(thread)
+        started.wait()
+
+    def _run_shard(self, started: threading.Barrier) -> None:
+        loop = Loop.get_current_loop()  # the new loop of this thread
+        self._loops.append(loop)
+        started.wait()
+        loop.run_loop()
+
+    def submit(self, coroutine: Coroutine) -> Future:
+        """
+        Run a coroutine as Task in one of the shards
+
+        The shards are chosen round-robin. Returns a Future of the calling
+        thread's loop for the result.
+        """
+        loop = self._loops[self._next]
+        self._next = (self._next + 1) % len(self._loops)
+
+        future = Future(lambda: f"Shard result of {coroutine.__name__}")
+        loop.call_soon_threadsafe("submit", _start_task, coroutine, future)
+        return future
+
+    def close(self) -> None:
+        """Stop the loops of all shards and wait for their threads"""
+        for loop in self._loops:
+            loop.call_soon_threadsafe("stop", loop.stop)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self) -> "ShardedRunner":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
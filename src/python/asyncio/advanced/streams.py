@@ -0,0 +1,385 @@
+import types
+from typing import Any, Callable, Generator, Optional, Tuple
+
+from future import Future
+from transports import Protocol, Server, SocketTransport, connect, serve
+from wait import _set_result_unless_cancelled, ensure_future
+
+# limit for the read buffer and the length of a line
+DEFAULT_LIMIT = 64 * 1024
+
+
+class IncompleteReadError(EOFError):
+    """
+    Raised if the stream ends before the requested data has been read
+    """
+
+    def __init__(self, partial: bytes, expected: Optional[int]):
+        super().__init__(
+            f"{len(partial)} bytes read on a total of {expected} expected "
+            "bytes"
+        )
+        self.partial = partial
+        self.expected = expected
+
+
+class LimitOverrunError(Exception):
+    """
+    Raised if the separator isn't found within the limit of the read buffer
+    """
+
+    def __init__(self, message: str, consumed: int):
+        super().__init__(message)
+        self.consumed = consumed
+
+
+class StreamReader:
+    """
+    Read data from a connection
+
+    The received data is appended to a bytearray. Appending to and removing
+    from the front of a bytearray are amortized O(1).
+    """
+
+    def __init__(self, limit: int = DEFAULT_LIMIT):
+        self._limit = limit
+        self._buffer = bytearray()
+        self._eof = False
+        self._exception: Optional[Exception] = None
+        self._waiter: Optional[Future] = None
+        self._transport: Optional[SocketTransport] = None
+        self._paused = False
+
+    def set_transport(self, transport: SocketTransport) -> None:
+        self._transport = transport
+
+    def _wakeup_waiter(self) -> None:
+        waiter = self._waiter
+        if waiter is not None:
+            self._waiter = None
+            if not waiter.cancelled():
+                waiter.set_result(None)
+
+    def feed_data(self, data: memoryview) -> None:
+        self._buffer += data  # copies the data out of the transport's buffer
+        self._wakeup_waiter()
+
+        if (
+            self._transport is not None
+            and not self._paused
+            and len(self._buffer) > 2 * self._limit
+        ):
+            # nobody reads the data fast enough. stop reading from the socket
+            self._paused = True
+            self._transport.pause_reading()
+
+    def feed_eof(self) -> None:
+        self._eof = True
+        self._wakeup_waiter()
+
+    def set_exception(self, exc: Exception) -> None:
+        self._exception = exc
+        waiter = self._waiter
+        if waiter is not None:
+            self._waiter = None
+            if not waiter.cancelled():
+                waiter.set_exception(exc)
+
+    def at_eof(self) -> bool:
+        return self._eof and not self._buffer
+
+    def _maybe_resume_transport(self) -> None:
+        if self._paused and len(self._buffer) <= self._limit:
+            self._paused = False
+            self._transport.resume_reading()
+
+    def _consume(self, size: int) -> bytes:
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self._maybe_resume_transport()
+        return data
+
+    @types.coroutine
+    def _wait_for_data(self) -> Generator[Any, None, None]:
+        if self._waiter is not None:
+            raise RuntimeError("Another coroutine is already waiting for data")
+
+        # the buffer may have been filled above the limit without being
+        # consumed, for example by read(-1). we need more data anyway
+        if self._paused:
+            self._paused = False
+            self._transport.resume_reading()
+
+        self._waiter = Future("StreamReader wait for data")
+        try:
+            yield from self._waiter
+        finally:
+            self._waiter = None
+
+    @types.coroutine
+    def read(self, n: int = -1) -> Generator[Any, None, bytes]:
+        """
+        Read up to n bytes
+
+        If n is -1 read until the end of the stream.
+        """
+        if self._exception is not None:
+            raise self._exception
+
+        if n < 0:
+            while not self._eof:
+                yield from self._wait_for_data()
+            return self._consume(len(self._buffer))
+
+        if not self._buffer and not self._eof:
+            yield from self._wait_for_data()
+        return self._consume(n)
+
+    @types.coroutine
+    def readexactly(self, n: int) -> Generator[Any, None, bytes]:
+        """
+        Read exactly n bytes
+
+        Raises an IncompleteReadError if the stream ends before.
+        """
+        while len(self._buffer) < n:
+            if self._exception is not None:
+                raise self._exception
+            if self._eof:
+                partial = self._consume(len(self._buffer))
+                raise IncompleteReadError(partial, n)
+            yield from self._wait_for_data()
+        return self._consume(n)
+
+    @types.coroutine
+    def readuntil(
+        self, separator: bytes = b"\n"
+    ) -> Generator[Any, None, bytes]:
+        """
+        Read until the separator is found
+
+        The returned data includes the separator. Raises an IncompleteReadError
+        if the stream ends before and a LimitOverrunError if the separator
+        isn't found within the limit.
+        """
+        buffer = self._buffer
+        offset = 0
+        while True:
+            # only scan the newly received data. the separator may start at
+            # the end of the already scanned data
+            index = buffer.find(separator, offset)
+            if index >= 0:
+                break
+
+            offset = max(0, len(buffer) - len(separator) + 1)
+            if offset > self._limit:
+                raise LimitOverrunError(
+                    "Separator is not found, and chunk exceed the limit",
+                    offset,
+                )
+            if self._exception is not None:
+                raise self._exception
+            if self._eof:
+                partial = self._consume(len(buffer))
+                raise IncompleteReadError(partial, None)
+            yield from self._wait_for_data()
+
+        end = index + len(separator)
+        if end > self._limit:
+            raise LimitOverrunError(
+                "Separator is found, but chunk is longer than limit", index
+            )
+        return self._consume(end)
+
+    @types.coroutine
+    def readline(self) -> Generator[Any, None, bytes]:
+        """
+        Read a line ending with a newline
+
+        At the end of the stream the remaining data is returned.
+        """
+        try:
+            return (yield from self.readuntil(b"\n"))
+        except IncompleteReadError as exc:
+            return exc.partial
+
+    def __aiter__(self) -> "StreamReader":
+        return self
+
+    async def __anext__(self) -> bytes:
+        line = await self.readline()
+        if not line:
+            raise StopAsyncIteration
+        return line
+
+
+class StreamReaderProtocol(Protocol):
+    """
+    Pass the events of a transport to a StreamReader and StreamWriter
+    """
+
+    def __init__(
+        self,
+        reader: StreamReader,
+        client_connected: Optional[Callable] = None,
+    ):
+        self._reader = reader
+        self._client_connected = client_connected
+        self._paused = False
+        self._drain_waiters = []
+        self._connection_lost = False
+        self._closed = Future("StreamReaderProtocol closed")
+
+    def connection_made(self, transport: SocketTransport) -> None:
+        self._reader.set_transport(transport)
+        if self._client_connected is not None:
+            writer = StreamWriter(transport, self, self._reader)
+            result = self._client_connected(self._reader, writer)
+            if result is not None:
+                # a coroutine function has been passed
+                ensure_future(result)
+
+    def data_received(self, data: memoryview) -> None:
+        self._reader.feed_data(data)
+
+    def eof_received(self) -> None:
+        self._reader.feed_eof()
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._connection_lost = True
+        if exc is None:
+            self._reader.feed_eof()
+        else:
+            self._reader.set_exception(exc)
+
+        # wake up all writers waiting for drain
+        self._paused = False
+        self._wakeup_drain_waiters(exc)
+        if not self._closed.done():
+            self._closed.set_result(None)
+
+    def pause_writing(self) -> None:
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        self._paused = False
+        self._wakeup_drain_waiters(None)
+
+    def _wakeup_drain_waiters(self, exc: Optional[Exception]) -> None:
+        waiters, self._drain_waiters = self._drain_waiters, []
+        for waiter in waiters:
+            if waiter.cancelled():
+                continue
+            if exc is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(exc)
+
+    @types.coroutine
+    def _drain_helper(self) -> Generator[Any, None, None]:
+        if self._connection_lost:
+            raise ConnectionResetError("Connection lost")
+        if not self._paused:
+            return
+
+        waiter = Future("drain")
+        self._drain_waiters.append(waiter)
+        yield from waiter
+
+
+class StreamWriter:
+    """
+    Write data to a connection
+
+    write never blocks. Call drain afterwards to wait until the amount of
+    buffered data is below the low watermark of the transport.
+    """
+
+    def __init__(
+        self,
+        transport: SocketTransport,
+        protocol: StreamReaderProtocol,
+        reader: StreamReader,
+    ):
+        self._transport = transport
+        self._protocol = protocol
+        self._reader = reader
+
+    @property
+    def transport(self) -> SocketTransport:
+        return self._transport
+
+    def get_extra_info(self, name: str) -> Any:
+        return self._transport.get_extra_info(name)
+
+    def write(self, data: bytes) -> None:
+        self._transport.write(data)
+
+    def writelines(self, lines: Any) -> None:
+        self._transport.writelines(lines)
+
+    def can_write_eof(self) -> bool:
+        return False
+
+    def is_closing(self) -> bool:
+        return self._transport.is_closing()
+
+    def close(self) -> None:
+        self._transport.close()
+
+    @types.coroutine
+    def wait_closed(self) -> Generator[Any, None, None]:
+        closed = self._protocol._closed
+        if closed.done():
+            return
+
+        # every caller gets its own future. cancelling a waiting task must
+        # not cancel the shared future of the protocol
+        waiter = Future("StreamWriter wait closed")
+        closed.add_done_callback(
+            lambda _: _set_result_unless_cancelled(waiter, None)
+        )
+        yield from waiter
+
+    @types.coroutine
+    def drain(self) -> Generator[Any, None, None]:
+        """
+        Wait until the write buffer has drained below the low watermark
+
+        Returns immediately if the buffer hasn't exceeded the high watermark.
+        """
+        if self._reader._exception is not None:
+            raise self._reader._exception
+        yield from self._protocol._drain_helper()
+
+
+@types.coroutine
+def open_connection(
+    host: str, port: int, limit: int = DEFAULT_LIMIT
+) -> Generator[Any, None, Tuple[StreamReader, StreamWriter]]:
+    """Open a TCP connection and return a StreamReader and StreamWriter"""
+    reader = StreamReader(limit)
+    transport, protocol = yield from connect(
+        lambda: StreamReaderProtocol(reader), host, port
+    )
+    reader.set_transport(transport)
+    return reader, StreamWriter(transport, protocol, reader)
+
+
+def start_server(
+    client_connected: Callable,
+    host: str,
+    port: int,
+    limit: int = DEFAULT_LIMIT,
+) -> Server:
+    """
+    Listen for TCP connections
+
+    client_connected is called with a StreamReader and a StreamWriter for every
+    new connection. It may be a coroutine function.
+    """
+
+    def factory():
+        return StreamReaderProtocol(StreamReader(limit), client_connected)
+
+    return serve(factory, host, port)
@@ -0,0 +1,119 @@
+from typing import Any, Generator, Set
+
+from future import CancelledError, Future
+from handle import Name
+from loop import Loop
+
+
+class Task(Future):
+    """Task v12"""
+
+    __slots__ = ("_coroutine", "_fut_waiter", "_must_cancel")
+
+    def __init__(
+        self,
+        coroutine: Generator[Any, None, Any],
+        name: Name = None,
+        eager_start: bool = False,
+    ):
+        super().__init__(name)
+        self._coroutine = coroutine
+        self._fut_waiter = None
+        self._must_cancel = False
+        self._loop._tasks.add(self)
+        if eager_start:
+            # run the coroutine until it suspends for the first time. if it
+            # completes synchronously no Handle is scheduled at all
+            self.step()
+        else:
+            self.schedule()
+
+    def _default_name(self) -> str:
+        if self._coroutine is None:
+            # the coroutine is released when the task is done
+            return super()._default_name()
+        return f"Task for {self._coroutine.__name__}"
+
+    def step(self, exc: Exception = None) -> None:
+        self._fut_waiter = None
+
+        if self._must_cancel:
+            if not isinstance(exc, CancelledError):
+                exc = CancelledError()
+            self._must_cancel = False
+
+        try:
+            if exc is None:
+                yielded = self._coroutine.send(None)
+            else:
+                # This may also be a cancellation.
+                yielded = self._coroutine.throw(exc)
+        except StopIteration as e:
+            self._finish()
+            self.set_result(e.value)
+        except CancelledError:
+            # coroutine is cancelled
+            # update task status via future
+            self._finish()
+            # the traceback of a thrown exception references this frame and
+            # therefore the task. break the cycle
+            exc = None
+            super().cancel()
+        except Exception as exc:
+            # coroutine raised an error
+            # pass it to everyone waiting for this task. drop this frame from
+            # the traceback because it references the task via self
+            self._finish()
+            traceback = exc.__traceback__.tb_next
+            super().set_exception(exc.with_traceback(traceback))
+        else:
+            # no result yet
+            # like CPython's _asyncio_future_blocking a marker attribute is used
+            # to recognize futures instead of an isinstance check. this also
+            # works for future like objects not derived from our Future class
+            if getattr(yielded, "_is_future", False):
+                # we are blocked by some external event for example waiting for
+                # incoming data. let's wait until result is available
+                yielded.add_done_callback(self._wakeup)
+                self._fut_waiter = yielded
+                if self._must_cancel:  # may have been set since last suspend
+                    if yielded.cancel():
+                        self._must_cancel = False
+            else:
+                # just schedule again
+                self.schedule()
+
+    def _finish(self) -> None:
+        # the finished coroutine isn't needed anymore. its frame may still
+        # reference the task for example via a traceback
+        self._coroutine = None
+        self._loop._tasks.discard(self)
+
+    def schedule(self, exc: Exception = None) -> None:
+        self._loop.schedule(self._name, self.step, exc)
+
+    def cancel(self) -> bool:
+        if self.done():
+            return False
+
+        if self._fut_waiter is not None:
+            # we are waiting for a "blocked" result
+            if self._fut_waiter.cancel():
+                return True
+
+        # task is just scheduled now
+        self._must_cancel = True
+        return True
+
+    def _wakeup(self, future: Future) -> None:
+        # _wakeup already runs as a scheduled Handle. therefore continue the
+        # coroutine directly instead of scheduling another step/tick
+        # the coroutine gets the result or exception from the future when it
+        # resumes in Future.__iter__. raising the exception here would add
+        # this frame to its traceback and the frame references the future
+        self.step()
+
+
+def all_tasks() -> Set[Task]:
+    """Return the pending tasks of the current loop"""
+    return set(Loop.get_current_loop()._tasks)
@@ -0,0 +1,146 @@
+import types
+from collections import deque
+from typing import Any, Deque, Dict, Generator, List, Optional, Tuple
+
+from future import CancelledError, Future
+from task import Task
+from wait import _copy_state
+
+Coroutine = Generator[Any, None, Any]
+
+
+class TaskGroup:
+    """
+    A group of Tasks that are owned by a coroutine
+
+    If a Task of the group fails all other Tasks are cancelled. With
+    max_concurrency at most that many Tasks are running at the same time. The
+    other coroutines are queued and started as soon as a running Task is done.
+
+    Native coroutines can use the group as asynchronous context manager:
+
+        async with TaskGroup(max_concurrency=10) as group:
+            for url in urls:
+                group.create_task(fetch(url))
+
+    Generator based coroutines wait for the group explicitly:
+
+        group = TaskGroup(max_concurrency=10)
+        for url in urls:
+            group.create_task(fetch(url))
+        yield from group.wait()
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self._max_concurrency = max_concurrency
+        # running tasks and the future returned for them by create_task
+        self._running: Dict[Task, Optional[Future]] = {}
+        self._queued: Deque[Tuple[Coroutine, Future]] = deque()
+        self._errors: List[Exception] = []
+        self._aborting = False
+        self._waiter: Optional[Future] = None
+
+    def create_task(self, coroutine: Coroutine) -> Future:
+        """
+        Add a coroutine to the group
+
+        Returns a Future for the result of the coroutine. If all slots are
+        taken the coroutine is started later.
+        """
+        if self._aborting:
+            coroutine.close()
+            raise RuntimeError("TaskGroup is shutting down")
+
+        if self._has_free_slot():
+            return self._start(coroutine)
+
+        future = Future(lambda: f"Queued {coroutine.__name__}")
+        self._queued.append((coroutine, future))
+        return future
+
+    def _has_free_slot(self) -> bool:
+        return (
+            self._max_concurrency is None
+            or len(self._running) < self._max_concurrency
+        )
+
+    def _start(self, coroutine: Coroutine, future: Future = None) -> Task:
+        task = Task(coroutine)
+        self._running[task] = future
+        task.add_done_callback(self._on_task_done)
+        if future is not None:
+            # the future of a queued coroutine is only linked to its task by
+            # _copy_state. pass a cancellation of the future on to the task
+            future.add_done_callback(
+                lambda _: task.cancel() if future.cancelled() else None
+            )
+        return task
+
+    def _on_task_done(self, task: Task) -> None:
+        future = self._running.pop(task)
+        if future is not None:
+            _copy_state(task, future)
+
+        if not task.cancelled() and task.exception() is not None:
+            self._errors.append(task.exception())
+            self._abort()
+
+        # admit queued work as slots free up
+        while self._queued and self._has_free_slot():
+            coroutine, future = self._queued.popleft()
+            if future.cancelled():
+                coroutine.close()
+            else:
+                self._start(coroutine, future)
+
+        if not self._running and self._waiter is not None:
+            if not self._waiter.cancelled() and not self._waiter.done():
+                self._waiter.set_result(None)
+
+    def _abort(self) -> None:
+        if self._aborting:
+            return
+
+        self._aborting = True
+        for task in self._running:
+            task.cancel()
+        while self._queued:
+            coroutine, future = self._queued.popleft()
+            coroutine.close()
+            future.cancel()
+
+    @types.coroutine
+    def wait(self) -> Generator[Any, None, None]:
+        """
+        Wait until all Tasks of the group are done
+
+        Raises an ExceptionGroup if some Tasks failed. If the waiting coroutine
+        gets cancelled all Tasks of the group are cancelled too.
+        """
+        cancelled = False
+        while self._running:
+            self._waiter = Future("TaskGroup")
+            try:
+                yield from self._waiter
+            except CancelledError:
+                # wait for the cancelled tasks before passing on cancellation
+                cancelled = True
+                self._abort()
+            finally:
+                self._waiter = None
+
+        if self._errors:
+            raise ExceptionGroup("unhandled errors in TaskGroup", self._errors)
+        if cancelled:
+            raise CancelledError()
+
+    async def __aenter__(self) -> "TaskGroup":
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is not None:
+            self._abort()
+        await self.wait()
@@ -0,0 +1,88 @@
+import gc
+import sys
+import time
+import weakref
+
+from future import Future
+from loop import Loop
+from task import all_tasks
+from wait import ensure_future, gather, sleep, wait
+
+TASKS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+BATCH = 10_000
+
+
+async def succeed(number: int) -> int:
+    await sleep(0)
+    return number
+
+
+async def fail(number: int) -> int:
+    await sleep(0)
+    raise ValueError(number)
+
+
+async def wait_forever() -> None:
+    await Future("forever")
+
+
+def track(tasks: list, coroutine) -> Future:
+    task = ensure_future(coroutine)
+    tasks.append(weakref.ref(task))
+    return task
+
+
+async def completed(tasks: list) -> None:
+    results = await gather([track(tasks, succeed(i)) for i in range(BATCH)])
+    assert results == list(range(BATCH))
+
+
+async def failed(tasks: list) -> None:
+    try:
+        await gather([track(tasks, fail(i)) for i in range(BATCH)])
+    except ValueError:
+        pass
+
+    for i in range(BATCH):
+        # don't keep the task in a local variable. the traceback of the
+        # caught error references this frame and would create a cycle
+        try:
+            await track(tasks, fail(i))
+        except ValueError:
+            pass
+
+
+async def cancelled(tasks: list) -> None:
+    pending = {track(tasks, wait_forever()) for _ in range(BATCH)}
+    await sleep(0)
+    for task in pending:
+        task.cancel()
+    done, _ = await wait(pending)
+    assert all(task.cancelled() for task in done)
+
+
+async def main(scenario) -> list:
+    tasks = []
+    for _ in range(TASKS // BATCH):
+        await scenario(tasks)
+    return tasks
+
+
+loop = Loop.get_current_loop()
+gc.collect()
+# everything must be freed by reference counting alone
+gc.disable()
+
+for scenario in (completed, failed, cancelled):
+    start = time.perf_counter()
+    tasks = loop.run(main(scenario))
+    duration = time.perf_counter() - start
+
+    assert not all_tasks()
+    assert all(task() is None for task in tasks), "tasks are still alive"
+    unreachable = gc.collect()
+    assert unreachable == 0, f"{unreachable} objects in reference cycles"
+    print(
+        f"{scenario.__name__}: {len(tasks)} tasks freed without cycles "
+        f"in {duration:.2f}s"
+    )
@@ -0,0 +1,30 @@
+import threading
+import time
+
+from future import Future
+from loop import Loop
+
+DELAY = 1.0
+
+
+def main():
+    future = Future("Set from Thread")
+    # resolve the future from another thread while the loop is idle
+    timer = threading.Timer(DELAY, future.set_result, ("done",))
+    timer.start()
+    result = yield from future
+    return result, time.perf_counter()
+
+
+loop = Loop.get_current_loop()
+start = time.perf_counter()
+cpu_start = time.process_time()
+result, resumed = loop.run(main())
+cpu = time.process_time() - cpu_start
+latency = resumed - start - DELAY
+
+print(f"Idle for {DELAY}s using {cpu:.3f}s CPU time")
+print(f"Resumed {latency * 1000:.1f}ms after the Future got its result")
+assert result == "done"
+assert cpu < DELAY * 0.05, "Loop is spinning while idle"
+assert latency < 0.05, "Loop didn't wake up"
@@ -0,0 +1,24 @@
+import sys
+
+from loop import Loop
+from process import PIPE, create_subprocess_exec
+from streams import DEFAULT_LIMIT
+
+# more output than the limit of the StreamReaders. reading gets paused and
+# must be resumed while communicate waits for the end of the output
+SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 4 * DEFAULT_LIMIT
+
+
+async def main():
+    process = await create_subprocess_exec(
+        "head", "-c", str(SIZE), "/dev/zero", stdout=PIPE, stderr=PIPE
+    )
+    stdout, stderr = await process.communicate()
+    assert stdout == b"\0" * SIZE, f"got {len(stdout)} of {SIZE} bytes"
+    assert stderr == b""
+    assert process.returncode == 0
+    return len(stdout)
+
+
+loop = Loop.get_current_loop()
+print(f"communicate read {loop.run(main())} bytes")
@@ -0,0 +1,134 @@
+import resource
+import sys
+import time
+
+from locks import Semaphore
+from loop import Loop
+from streams import (
+    DEFAULT_LIMIT,
+    IncompleteReadError,
+    open_connection,
+    start_server,
+)
+from wait import ensure_future, gather, sleep
+
+CLIENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+LINES = 10
+# more concurrent connects overflow the listen backlog of the server
+CONNECTS = 1000
+
+
+async def handle_client(reader, writer):
+    # a line protocol: answer every line in upper case
+    async for line in reader:
+        writer.write(line.upper())
+        await writer.drain()
+    writer.close()
+
+
+async def client(port: int, number: int, connecting: Semaphore):
+    async with connecting:
+        reader, writer = await open_connection("127.0.0.1", port)
+    for i in range(LINES):
+        writer.write(f"client {number} line {i}\n".encode())
+    await writer.drain()
+
+    lines = [await reader.readline() for _ in range(LINES)]
+    writer.close()
+    return lines == [
+        f"CLIENT {number} LINE {i}\n".encode() for i in range(LINES)
+    ]
+
+
+async def send_all(data: bytes, reader, writer):
+    writer.write(data)
+    writer.close()
+
+
+async def check_readexactly(port: int):
+    reader, writer = await open_connection("127.0.0.1", port)
+    # the server closes the connection after sending all data
+    assert await reader.readexactly(3) == b"abc"
+    assert await reader.readexactly(3) == b"def"
+    try:
+        await reader.readexactly(3)
+    except IncompleteReadError as exc:
+        assert exc.partial == b"g"
+    else:
+        raise AssertionError("IncompleteReadError not raised")
+    writer.close()
+
+
+async def check_large_read(port: int, size: int):
+    # more data than the limit of the reader. the transport gets paused and
+    # must be resumed while waiting for the rest
+    reader, writer = await open_connection("127.0.0.1", port)
+    assert await reader.readexactly(size) == b"x" * size
+    writer.close()
+
+    reader, writer = await open_connection("127.0.0.1", port)
+    assert await reader.read() == b"x" * size
+    writer.close()
+
+
+async def check_drain(port: int):
+    reader, writer = await open_connection("127.0.0.1", port)
+    writer.transport.set_write_buffer_limits(high=1024)
+    # the server doesn't read. the socket buffers fill up until the write
+    # buffer of the transport exceeds the high watermark
+    chunk = b"x" * 65536
+    for _ in range(1000):
+        writer.write(chunk)
+        if writer.transport.get_write_buffer_size() > 1024:
+            break
+
+    drain = ensure_future(writer.drain())
+    await sleep(0.01)
+    assert not drain.done(), "drain didn't wait"
+    writer.transport.abort()
+    await sleep(0)
+    assert drain.done(), "drain didn't wake up"
+
+
+async def main():
+    server = start_server(handle_client, "127.0.0.1", 0)
+    start = time.perf_counter()
+    connecting = Semaphore(CONNECTS)
+    results = await gather(
+        [client(server.port, i, connecting) for i in range(CLIENTS)]
+    )
+    duration = time.perf_counter() - start
+    server.close()
+    print(f"{CLIENTS} clients sent {CLIENTS * LINES} lines in {duration:.2f}s")
+    assert all(results), "Wrong answers"
+
+    server = start_server(
+        lambda reader, writer: send_all(b"abcdefg", reader, writer),
+        "127.0.0.1",
+        0,
+    )
+    await check_readexactly(server.port)
+    server.close()
+
+    size = 4 * DEFAULT_LIMIT
+    server = start_server(
+        lambda reader, writer: send_all(b"x" * size, reader, writer),
+        "127.0.0.1",
+        0,
+    )
+    await check_large_read(server.port, size)
+    server.close()
+
+    server = start_server(lambda reader, writer: None, "127.0.0.1", 0)
+    await check_drain(server.port)
+    server.close()
+
+
+# every client needs two file descriptors. one for each side of the connection
+soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+needed = 2 * CLIENTS + 64
+if soft < needed:
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+loop = Loop.get_current_loop()
+loop.run(main())
@@ -0,0 +1,66 @@
+from collections import deque
+from typing import Deque, NamedTuple
+
+from handle import Handle
+from loop import Loop
+
+
+class TraceHook:
+    """
+    Hook for tracing the steps/ticks of a Loop
+
+    All methods do nothing by default. Override the ones of interest and pass
+    the hook to Loop.set_trace_hook.
+    """
+
+    def on_tick_start(self, loop: Loop, handles: Deque[Handle]) -> None:
+        """Called before the handles of a step/tick are run"""
+
+    def on_handle_run(
+        self, loop: Loop, handle: Handle, duration: float
+    ) -> None:
+        """Called after a handle has been run"""
+
+    def on_tick_end(self, loop: Loop, count: int, duration: float) -> None:
+        """Called after all handles of a step/tick have been run"""
+
+
+class PrintHook(TraceHook):
+    """Print the handles of every step/tick like our previous Loops"""
+
+    def __init__(self):
+        self._step = 0
+
+    def on_tick_start(self, loop: Loop, handles: Deque[Handle]) -> None:
+        self._step += 1
+        print("Loop step", self._step, list(handles))
+
+
+class TickCounter(TraceHook):
+    """Count the steps/ticks of the loop"""
+
+    def __init__(self):
+        self.ticks = 0
+
+    def on_tick_end(self, loop: Loop, count: int, duration: float) -> None:
+        self.ticks += 1
+
+
+class Tick(NamedTuple):
+    time: float  # time of the loop's clock at the end of the step/tick
+    handles: int
+    duration: float
+
+
+class TickRecorder(TraceHook):
+    """
+    Record the number of handles and the duration of the latest steps/ticks
+
+    Only the latest size ticks are kept.
+    """
+
+    def __init__(self, size: int = 1024):
+        self.ticks: Deque[Tick] = deque(maxlen=size)
+
+    def on_tick_end(self, loop: Loop, count: int, duration: float) -> None:
+        self.ticks.append(Tick(loop.time(), count, duration))
@@ -0,0 +1,365 @@
+import socket
+import threading
+import types
+from collections import deque
+from typing import Any, Callable, Deque, Generator, Optional, Tuple
+
+from loop import Loop
+
+# maximum number of buffers passed to a single sendmsg call
+MAX_WRITE_BUFFERS = 1024
+
+DEFAULT_READ_BUFFER_SIZE = 256 * 1024
+
+# every thread has its own loop and its handles run one after another.
+# therefore only one transport of a thread reads at a time and all of them
+# can share a single read buffer
+_local = threading.local()
+
+# seconds to stop accepting connections after accept failed, for example
+# because of too many open files
+ACCEPT_RETRY_DELAY = 0.1
+
+# pause the protocol if more than this number of bytes is queued for writing
+DEFAULT_HIGH_WATERMARK = 64 * 1024
+
+
+class Protocol:
+    """
+    Receive the events of a connection
+
+    All methods do nothing by default. Override the ones of interest.
+    """
+
+    def connection_made(self, transport: "SocketTransport") -> None:
+        """Called when the connection is established"""
+
+    def data_received(self, data: memoryview) -> None:
+        """
+        Called with the received data
+
+        data is a view of the transport's read buffer. It is only valid until
+        this method returns. Copy it if the data is needed later on.
+        """
+
+    def eof_received(self) -> None:
+        """Called when the other end has closed its side of the connection"""
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        """Called when the connection is closed"""
+
+    def pause_writing(self) -> None:
+        """Called when the write buffer exceeds the high watermark"""
+
+    def resume_writing(self) -> None:
+        """Called when the write buffer drained below the low watermark"""
+
+
+def _shared_read_view() -> memoryview:
+    try:
+        return _local.read_view
+    except AttributeError:
+        view = _local.read_view = memoryview(
+            bytearray(DEFAULT_READ_BUFFER_SIZE)
+        )
+        return view
+
+
+class SocketTransport:
+    """
+    Read from and write to a non-blocking socket for a Protocol
+
+    Data is read with recv_into into a preallocated buffer that is shared by
+    all transports of the loop. Pass buffer_size to use a buffer of its own
+    instead. Pending writes are queued and sent together with sendmsg.
+    """
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        protocol: Protocol,
+        buffer_size: Optional[int] = None,
+    ):
+        self._loop = Loop.get_current_loop()
+        self._sock = sock
+        self._fd = sock.fileno()
+        self._protocol = protocol
+        if buffer_size is None:
+            self._read_view = _shared_read_view()
+        else:
+            self._read_view = memoryview(bytearray(buffer_size))
+        self._write_buffers: Deque[memoryview] = deque()
+        self._write_size = 0
+        self._high_watermark = DEFAULT_HIGH_WATERMARK
+        self._low_watermark = DEFAULT_HIGH_WATERMARK // 4
+        self._protocol_paused = False
+        self._reading = False
+        self._writing = False
+        self._closing = False
+        self._closed = False
+
+        self._loop.schedule(
+            "connection_made", self._protocol.connection_made, self
+        )
+        self.resume_reading()
+
+    def get_extra_info(self, name: str) -> Any:
+        if name == "socket":
+            return self._sock
+        if name == "peername":
+            return self._sock.getpeername()
+        if name == "sockname":
+            return self._sock.getsockname()
+        return None
+
+    def is_closing(self) -> bool:
+        return self._closing or self._closed
+
+    def pause_reading(self) -> None:
+        if self._reading:
+            self._reading = False
+            self._loop.remove_reader(self._fd)
+
+    def resume_reading(self) -> None:
+        if not self._reading and not self.is_closing():
+            self._reading = True
+            self._loop.add_reader(self._fd, "transport read", self._read_ready)
+
+    def _read_ready(self) -> None:
+        try:
+            received = self._sock.recv_into(self._read_view)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as exc:
+            self._close(exc)
+            return
+
+        if received:
+            # no copy. the protocol gets a view of the read buffer
+            self._protocol.data_received(self._read_view[:received])
+        else:
+            self.pause_reading()
+            self._protocol.eof_received()
+            self.close()
+
+    def get_write_buffer_size(self) -> int:
+        """Number of bytes queued for sending"""
+        return self._write_size
+
+    def set_write_buffer_limits(
+        self, high: Optional[int] = None, low: Optional[int] = None
+    ) -> None:
+        """
+        Set the watermarks for pausing and resuming the protocol's writing
+
+        low defaults to a quarter of high.
+        """
+        if high is None:
+            high = DEFAULT_HIGH_WATERMARK
+        if low is None:
+            low = high // 4
+        if not 0 <= low <= high:
+            raise ValueError("low must be between 0 and high")
+
+        self._high_watermark = high
+        self._low_watermark = low
+        self._maybe_pause_protocol()
+
+    def write(self, data: bytes) -> None:
+        """Send data. Data that can't be sent immediately is queued"""
+        if self.is_closing():
+            raise RuntimeError("Transport is closing")
+        if not data:
+            return
+
+        if not self._write_buffers:
+            # try to send directly without copying the data
+            try:
+                sent = self._sock.send(data)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            except OSError as exc:
+                self._close(exc)
+                return
+            if sent == len(data):
+                return
+            data = memoryview(data)[sent:]
+            self._start_writing()
+
+        self._queue(data)
+
+    def writelines(self, lines: Any) -> None:
+        """Queue all lines and send them together with a single sendmsg"""
+        if self.is_closing():
+            raise RuntimeError("Transport is closing")
+
+        for data in lines:
+            if data:
+                self._queue(data)
+        if not self._writing and self._write_buffers:
+            # try to send directly instead of waiting for the next step/tick
+            self._write_ready()
+            if self._write_buffers:
+                self._start_writing()
+
+    def _start_writing(self) -> None:
+        self._writing = True
+        self._loop.add_writer(self._fd, "transport write", self._write_ready)
+
+    def _stop_writing(self) -> None:
+        if self._writing:
+            self._writing = False
+            self._loop.remove_writer(self._fd)
+
+    def _queue(self, data: bytes) -> None:
+        view = memoryview(data)
+        if not view.readonly:
+            # mutable buffers, for example a view of a read buffer, may change
+            # until they are sent
+            view = memoryview(bytes(view))
+        self._write_buffers.append(view.cast("B"))
+        self._write_size += view.nbytes
+        self._maybe_pause_protocol()
+
+    def _maybe_pause_protocol(self) -> None:
+        if self._protocol_paused:
+            return
+        if self._write_size > self._high_watermark:
+            self._protocol_paused = True
+            self._protocol.pause_writing()
+
+    def _write_ready(self) -> None:
+        buffers = self._write_buffers
+        try:
+            if len(buffers) <= MAX_WRITE_BUFFERS:
+                sent = self._sock.sendmsg(buffers)
+            else:
+                sent = self._sock.sendmsg(
+                    [buffers[i] for i in range(MAX_WRITE_BUFFERS)]
+                )
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as exc:
+            self._close(exc)
+            return
+
+        # remove the sent data from the queue
+        self._write_size -= sent
+        while sent:
+            view = buffers[0]
+            if sent >= view.nbytes:
+                buffers.popleft()
+                sent -= view.nbytes
+            else:
+                buffers[0] = view[sent:]
+                sent = 0
+
+        if self._protocol_paused and self._write_size <= self._low_watermark:
+            self._protocol_paused = False
+            self._protocol.resume_writing()
+
+        if not buffers:
+            self._stop_writing()
+            if self._closing:
+                self._close(None)
+
+    def close(self) -> None:
+        """Close the transport after all queued data has been sent"""
+        if self.is_closing():
+            return
+
+        self._closing = True
+        self.pause_reading()
+        if not self._write_buffers:
+            self._close(None)
+
+    def abort(self) -> None:
+        """Close the transport immediately. Queued data is lost"""
+        self._close(None)
+
+    def _close(self, exc: Optional[Exception]) -> None:
+        if self._closed:
+            return
+
+        self._closed = True
+        self._closing = True
+        self.pause_reading()
+        self._stop_writing()
+        self._write_buffers.clear()
+        self._write_size = 0
+        self._sock.close()
+        self._loop.schedule(
+            "connection_lost", self._protocol.connection_lost, exc
+        )
+
+
+ProtocolFactory = Callable[[], Protocol]
+
+
+@types.coroutine
+def connect(
+    protocol_factory: ProtocolFactory, host: str, port: int
+) -> Generator[Any, None, Tuple[SocketTransport, Protocol]]:
+    """Open a TCP connection and return the transport and protocol"""
+    loop = Loop.get_current_loop()
+    sock = yield from loop.create_connection(host, port)
+    protocol = protocol_factory()
+    return SocketTransport(sock, protocol), protocol
+
+
+class Server:
+    """
+    Accept TCP connections and create a transport and protocol for each
+    """
+
+    def __init__(self, protocol_factory: ProtocolFactory, host: str, port: int):
+        self._loop = Loop.get_current_loop()
+        self._protocol_factory = protocol_factory
+        self._sock = socket.create_server((host, port), backlog=1024)
+        self._sock.setblocking(False)
+        self._retry_handle = None
+        self._start_accepting()
+
+    def _start_accepting(self) -> None:
+        self._retry_handle = None
+        self._loop.add_reader(
+            self._sock.fileno(), "server accept", self._accept_ready
+        )
+
+    @property
+    def port(self) -> int:
+        return self._sock.getsockname()[1]
+
+    def _accept_ready(self) -> None:
+        # accept all pending connections at once
+        while True:
+            try:
+                conn, _address = self._sock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # for example too many open files. the pending connections
+                # keep the socket readable and the loop would spin. stop
+                # accepting for a while
+                self._loop.remove_reader(self._sock.fileno())
+                self._retry_handle = self._loop.call_later(
+                    ACCEPT_RETRY_DELAY,
+                    "server accept retry",
+                    self._start_accepting,
+                )
+                return
+            conn.setblocking(False)
+            SocketTransport(conn, self._protocol_factory())
+
+    def close(self) -> None:
+        """Stop accepting new connections"""
+        if self._retry_handle is not None:
+            self._retry_handle.cancel()
+            self._retry_handle = None
+        self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+
+
+def serve(protocol_factory: ProtocolFactory, host: str, port: int) -> Server:
+    """Listen for TCP connections on host and port"""
+    return Server(protocol_factory, host, port)
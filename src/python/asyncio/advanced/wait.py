@@ -0,0 +1,270 @@
+import types
+from collections import deque
+from inspect import iscoroutine, isgenerator
+from typing import (
+    Any,
+    Deque,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from future import Future
+from loop import Loop
+from task import Task
+
+Coroutine = Generator[Any, None, Any]
+
+FIRST_COMPLETED = "FIRST_COMPLETED"
+FIRST_EXCEPTION = "FIRST_EXCEPTION"
+ALL_COMPLETED = "ALL_COMPLETED"
+
+
+def ensure_future(
+    coro_or_future: Union[Coroutine, Future], eager_start: bool = False
+) -> Future:
+    """
+    Ensure that passed object is a Future.
+
+    If it is already a Future it is returned. If it is a coroutine a Task
+    wrapping the coroutine is returned. With eager_start the coroutine runs
+    immediately until it suspends for the first time.
+    """
+    if isinstance(coro_or_future, Future):
+        return coro_or_future
+    elif iscoroutine(coro_or_future) or isgenerator(coro_or_future):
+        return Task(coro_or_future, eager_start=eager_start)
+    else:
+        raise TypeError("A Future or a coroutine is required")
+
+
+def _finished(future: Future) -> bool:
+    return future.done() or future.cancelled()
+
+
+def _failed(future: Future) -> bool:
+    return future.done() and future.exception() is not None
+
+
+def _release_waiter(waiter: Future) -> None:
+    if not _finished(waiter):
+        waiter.set_result(None)
+
+
+def _copy_state(source: Future, destination: Future) -> None:
+    if _finished(destination):
+        return
+    if source.cancelled():
+        destination.cancel()
+    elif source.exception() is not None:
+        destination.set_exception(source.exception())
+    else:
+        destination.set_result(source.result())
+
+
+@types.coroutine
+def gather(
+    coros_or_futures: Iterable[Union[Coroutine, Future]],
+    cancel_on_error: bool = False,
+    group_exceptions: bool = False,
+) -> List[Any]:
+    """
+    Wait for coroutines or futures to finish and gather their results as a list
+
+    With cancel_on_error all other futures are cancelled as soon as one raises
+    an exception. With group_exceptions all raised exceptions are collected
+    and raised together as an ExceptionGroup.
+    """
+    futures = [ensure_future(f) for f in coros_or_futures]
+    counter = len(futures)
+    if not futures:
+        return []
+
+    waiter = Future(lambda: f"Waiter for {', '.join(map(str, futures))}")
+    errors = []
+
+    def _on_completion(future):
+        nonlocal counter
+        counter -= 1
+        if _failed(future):
+            if cancel_on_error and not errors:
+                # don't waste time on results that won't be used anymore
+                for sibling in futures:
+                    sibling.cancel()
+            errors.append(future.exception())
+        if counter <= 0:
+            # all results are available let's wakeup
+            waiter.set_result(None)
+
+    for future in futures:
+        future.add_done_callback(_on_completion)
+
+    yield from waiter
+
+    try:
+        if errors:
+            if group_exceptions:
+                raise ExceptionGroup("gather failed", errors)
+            if cancel_on_error:
+                # raise the error that caused the cancellation
+                raise errors[0]
+
+        results = []
+        for future in futures:
+            results.append(future.result())
+        return results
+    finally:
+        # the traceback of a raised error references this frame and the
+        # futures reference the error. break the cycle
+        coros_or_futures = futures = errors = future = None
+
+
+@types.coroutine
+def wait(
+    coros_or_futures: Iterable[Union[Coroutine, Future]],
+    timeout: Optional[float] = None,
+    return_when: str = ALL_COMPLETED,
+) -> Tuple[Set[Future], Set[Future]]:
+    """
+    Wait for coroutines or futures to finish
+
+    return_when is one of FIRST_COMPLETED, FIRST_EXCEPTION or ALL_COMPLETED.
+    Returns a set of done and a set of pending futures. The pending futures are
+    not cancelled if the timeout is reached.
+    """
+    futures = {ensure_future(f) for f in coros_or_futures}
+    done = {f for f in futures if _finished(f)}
+    pending = futures - done
+
+    if (
+        not pending
+        or (return_when == FIRST_COMPLETED and done)
+        or (return_when == FIRST_EXCEPTION and any(map(_failed, done)))
+    ):
+        return done, pending
+
+    loop = Loop.get_current_loop()
+    waiter = Future("wait")
+    counter = len(pending)
+
+    def _on_completion(future):
+        nonlocal counter
+        counter -= 1
+        if (
+            counter <= 0
+            or return_when == FIRST_COMPLETED
+            or (return_when == FIRST_EXCEPTION and _failed(future))
+        ):
+            _release_waiter(waiter)
+
+    timeout_handle = None
+    if timeout is not None:
+        timeout_handle = loop.call_later(
+            timeout, "wait timeout", _release_waiter, waiter
+        )
+
+    for future in pending:
+        future.add_done_callback(_on_completion)
+
+    try:
+        yield from waiter
+    finally:
+        if timeout_handle is not None:
+            timeout_handle.cancel()
+        # don't keep the waiter and the callback alive via pending futures
+        for future in pending:
+            future.remove_done_callback(_on_completion)
+
+    done = {f for f in futures if _finished(f)}
+    return done, futures - done
+
+
+def as_completed(
+    coros_or_futures: Iterable[Union[Coroutine, Future]],
+    timeout: Optional[float] = None,
+) -> Iterator[Future]:
+    """
+    Iterate over the coroutines or futures in the order they complete
+
+    Yields a Future for every passed coroutine or future. Awaiting it returns
+    the result of the next completed one. If the timeout is reached the yielded
+    Futures raise a TimeoutError.
+    """
+    todo = {ensure_future(f) for f in coros_or_futures}
+    completed: Deque[Future] = deque()
+    waiters: Deque[Future] = deque()
+    timed_out = False
+    loop = Loop.get_current_loop()
+
+    def _on_completion(future):
+        todo.discard(future)
+        while waiters:
+            waiter = waiters.popleft()
+            if not _finished(waiter):  # skip cancelled waiters
+                _copy_state(future, waiter)
+                return
+        completed.append(future)
+
+    def _on_timeout():
+        nonlocal timed_out
+        timed_out = True
+        for future in todo:
+            future.remove_done_callback(_on_completion)
+        todo.clear()
+        while waiters:
+            waiter = waiters.popleft()
+            if not _finished(waiter):
+                waiter.set_exception(TimeoutError())
+
+    timeout_handle = None
+    if timeout is not None:
+        timeout_handle = loop.call_later(
+            timeout, "as_completed timeout", _on_timeout
+        )
+
+    for future in todo:
+        future.add_done_callback(_on_completion)
+
+    try:
+        for _ in range(len(todo)):
+            if completed:
+                yield completed.popleft()
+            else:
+                waiter = Future("as_completed")
+                if timed_out:
+                    waiter.set_exception(TimeoutError())
+                else:
+                    waiters.append(waiter)
+                yield waiter
+    finally:
+        if timeout_handle is not None:
+            timeout_handle.cancel()
+        # the iteration may have been stopped early
+        for future in todo:
+            future.remove_done_callback(_on_completion)
+
+
+def _set_result_unless_cancelled(future: Future, result: Any) -> None:
+    if not future.cancelled():
+        future.set_result(result)
+
+
+@types.coroutine
+def sleep(delay: float, result: Any = None) -> Any:
+    """
+    Suspend the current coroutine for delay seconds
+    """
+    loop = Loop.get_current_loop()
+    future = Future("sleep")
+    handle = loop.call_later(
+        delay, "sleep", _set_result_unless_cancelled, future, result
+    )
+    try:
+        return (yield from future)
+    finally:
+        handle.cancel()
@@ -0,0 +1,40 @@
+"""
+Benchmark the cost of a single loop step/tick
+
+Schedules an increasing number of handles and runs them within one tick. With
+a FIFO queue that supports O(1) removal from the front the time per handle
+stays constant and therefore the tick cost grows linearly.
+"""
+
+import sys
+import time
+
+from loop import Loop
+
+
+def noop() -> None:
+    pass
+
+
+def measure(loop: Loop, count: int) -> float:
+    for _ in range(count):
+        loop.schedule("noop", noop)
+
+    start = time.perf_counter()
+    loop.run_step()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    max_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+    loop = Loop.get_current_loop()
+
+    print(f"{'handles':>10} {'tick [s]':>10} {'per handle [ns]':>16}")
+    count = 10
+    while count <= max_count:
+        duration = measure(loop, count)
+        print(f"{count:>10} {duration:>10.4f} {duration / count * 1e9:>16.1f}")
+        count *= 10
+
+
+main()
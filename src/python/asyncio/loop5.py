@@ -1,3 +1,4 @@
+from collections import deque
 from typing import Any, Callable, Generator
 
 from handle import Handle
@@ -10,7 +11,7 @@ class Loop:
 
     def __init__(self):
         self._running = False
-        self._scheduled = []
+        self._scheduled = deque()
 
     @classmethod
     def get_current_loop(cls) -> "Loop":
@@ -21,30 +22,20 @@ class Loop:
     def run_step(self) -> None:
         """Run a single step/tick of the loop"""
         # execute all current known handles only.
-        # not the ones added while running the handle callbacks
-        scheduled = self._scheduled.copy()
-        self._scheduled.clear()
+        # not the ones added while running the handle callbacks.
+        # swapping the queue with a fresh one avoids copying all handles
+        scheduled, self._scheduled = self._scheduled, deque()
 
-        try:
-            handle = scheduled.pop(0)  # fifo: extract first item
-            while handle is not None:
-                handle.run()
-                handle = scheduled.pop(0)  # fifo: extract first item
-        except IndexError:
-            # list is empty
-            pass
-        # a shorter and even more smarter version for the above code could be
-        #
-        # for _ in range(len(self._scheduled)):
-        #     handle = self._scheduled.pop(0)  # fifo: extract first item
-        #     handle.run()
+        while scheduled:
+            handle = scheduled.popleft()  # fifo: extract first item
+            handle.run()
 
     def run_loop(self) -> None:
         """Run the loop"""
         self._running = True
         step = 1
         while self._running:
-            print("Loop step", step, self._scheduled)
+            print("Loop step", step, list(self._scheduled))
             self.run_step()
             step += 1
 